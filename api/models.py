@@ -2,9 +2,11 @@
 Pydantic models for M3U2strm3 Web Interface API.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any, Type, TypeVar
 from datetime import datetime
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, TypeAdapter
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
 
 
 class ProcessingConfig(BaseModel):
@@ -26,8 +28,8 @@ class ProcessingConfig(BaseModel):
     
     # Processing options
     dry_run: bool = Field(False, description="Dry run mode")
-    max_workers: Optional[int] = Field(None, description="Maximum worker threads")
-    verbosity: str = Field("normal", description="Logging verbosity level")
+    max_workers: Optional[int] = Field(None, ge=1, description="Maximum worker threads")
+    verbosity: Literal["quiet", "normal", "verbose", "debug"] = Field("normal", description="Logging verbosity level")
     
     # Filtering options
     allowed_movie_countries: List[str] = Field(["US", "GB", "CA"], description="Allowed movie countries")
@@ -42,19 +44,6 @@ class ProcessingConfig(BaseModel):
     
     # Keyword filtering
     ignore_keywords: Dict[str, List[str]] = Field({}, description="Keywords to ignore")
-    
-    @validator('verbosity')
-    def validate_verbosity(cls, v):
-        valid_levels = ['quiet', 'normal', 'verbose', 'debug']
-        if v not in valid_levels:
-            raise ValueError(f"Verbosity must be one of: {', '.join(valid_levels)}")
-        return v
-    
-    @validator('max_workers')
-    def validate_max_workers(cls, v):
-        if v is not None and v < 1:
-            raise ValueError("max_workers must be positive")
-        return v
 
 
 class ProcessingStatus(BaseModel):
@@ -121,3 +110,27 @@ class ProgressUpdate(BaseModel):
     elapsed_time: float = Field(0.0, description="Elapsed time in seconds")
     stats: Dict[str, int] = Field({}, description="Current statistics")
     errors: List[str] = Field([], description="Current errors")
+
+
+# Validators/serializers for every API model, built once at import time so
+# the first request does not pay for core schema construction
+_ADAPTERS: Dict[Type[BaseModel], TypeAdapter] = {
+    model: TypeAdapter(model)
+    for model in (
+        ProcessingConfig,
+        ProcessingStatus,
+        ProcessingResult,
+        FileUploadResponse,
+        SystemStatus,
+        LogEntry,
+        ProgressUpdate,
+    )
+}
+
+
+def get_adapter(model_cls: Type[ModelT]) -> TypeAdapter[ModelT]:
+    """Return the cached TypeAdapter for an API model class."""
+    return _ADAPTERS[model_cls]
+
+
+PROCESSING_CONFIG_ADAPTER: TypeAdapter[ProcessingConfig] = get_adapter(ProcessingConfig)
@@ -12,17 +12,36 @@ import sys
 from typing import Dict, List, Optional, Any, Callable
 from dataclasses import dataclass, field
 from datetime import datetime
-from pathlib import Path
-import json
 
-from utils.web_progress_tracker import WebProgressTracker
+from utils.web_progress_tracker import WebProgressTracker, WebProgressPhase
 from utils.file_handler import FileHandler
 from api.models import ProcessingConfig, ProcessingStatus, ProcessingResult
 
 logger = logging.getLogger(__name__)
 
+# Progress is pushed to subscribers at most this often (seconds) ...
+PROGRESS_PUBLISH_INTERVAL = 0.25
+# ... and only once it has advanced by at least this many percent
+PROGRESS_PUBLISH_MIN_DELTA = 1.0
 
-@dataclass
+# Jobs beyond this many waiting are rejected instead of queued
+MAX_PENDING_JOBS = 32
+
+# Simulated processing phases and their durations (seconds)
+_PHASES: tuple[tuple[WebProgressPhase, int], ...] = (
+    (WebProgressPhase.SCANNING_LOCAL, 20),
+    (WebProgressPhase.PARSING_M3U, 25),
+    (WebProgressPhase.FILTERING_TMDB, 30),
+    (WebProgressPhase.CREATING_STRM, 20),
+    (WebProgressPhase.CLEANUP, 5),
+)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the pending queue is full."""
+
+
+@dataclass(slots=True)
 class ProcessingJob:
     """Represents a processing job."""
     job_id: str
@@ -34,6 +53,20 @@ class ProcessingJob:
     error_message: Optional[str] = None
     result: Optional[ProcessingResult] = None
     task: Optional[asyncio.Task] = None
+    start_time_ns: int = 0
+    start_time_iso: Optional[str] = None
+    end_time_iso: Optional[str] = None
+    
+    def mark_started(self):
+        """Record the start time along with its ISO string and sort key."""
+        self.start_time_ns = time.time_ns()
+        self.start_time = datetime.fromtimestamp(self.start_time_ns / 1e9)
+        self.start_time_iso = self.start_time.isoformat()
+    
+    def mark_ended(self):
+        """Record the end time along with its ISO string."""
+        self.end_time = datetime.now()
+        self.end_time_iso = self.end_time.isoformat()
 
 
 class ProcessingManager:
@@ -46,34 +79,54 @@ class ProcessingManager:
         # Job management
         self._jobs: Dict[str, ProcessingJob] = {}
         self._job_counter = 0
+        self._job_id_prefix = f"job_{time.time_ns():x}_"
         self._current_job: Optional[ProcessingJob] = None
-        self._job_lock = asyncio.Lock()
+        self._run_slot = asyncio.Semaphore(1)
         
         # Task management
-        self._processing_task: Optional[asyncio.Task] = None
+        self._pending: asyncio.Queue[Optional[str]] = asyncio.Queue(maxsize=MAX_PENDING_JOBS)
         self._shutdown_event = asyncio.Event()
-        self._stop_requested = False
+        self._processing_task: asyncio.Task = asyncio.create_task(self._processing_loop())
         
         # Signal handling
-        self._original_sigint_handler = None
+        self._sigint_handler_installed = False
+        self._previous_sigint_handler = None
         self._setup_signal_handlers()
     
     def _setup_signal_handlers(self):
         """Set up signal handlers for graceful shutdown."""
         try:
-            self._original_sigint_handler = signal.signal(signal.SIGINT, self._handle_shutdown)
+            # Remember the server's own handler (e.g. uvicorn's) so it can be handed back
+            previous = signal.getsignal(signal.SIGINT)
+            asyncio.get_running_loop().add_signal_handler(signal.SIGINT, self._handle_shutdown)
+            self._previous_sigint_handler = previous
+            self._sigint_handler_installed = True
             logger.debug("Signal handlers installed for graceful shutdown")
-        except ValueError:
-            logger.debug("Cannot install signal handlers (not in main thread)")
+        except (NotImplementedError, RuntimeError, ValueError):
+            logger.debug("Cannot install signal handlers (unsupported loop or not in main thread)")
     
-    def _handle_shutdown(self, signum, frame):
+    def _handle_shutdown(self):
         """Handle shutdown signals gracefully."""
         logger.info("Shutdown signal received, stopping current job...")
         asyncio.create_task(self.stop_current_job())
         
-        # Restore original signal handler
-        if self._original_sigint_handler and self._original_sigint_handler != signal.SIG_DFL:
-            signal.signal(signal.SIGINT, self._original_sigint_handler)
+        # Only the first Ctrl+C is ours; the next one reaches the previous handler
+        self._restore_signal_handler()
+    
+    def _restore_signal_handler(self):
+        """Remove the loop's SIGINT hook and reinstate the handler it replaced."""
+        if not self._sigint_handler_installed:
+            return
+        self._sigint_handler_installed = False
+        asyncio.get_running_loop().remove_signal_handler(signal.SIGINT)
+        previous = self._previous_sigint_handler
+        if previous is None:
+            # Installed from C code; fall back to Python's KeyboardInterrupt handler
+            previous = signal.default_int_handler
+        try:
+            signal.signal(signal.SIGINT, previous)
+        except (ValueError, TypeError):
+            logger.debug("Cannot restore previous SIGINT handler")
     
     async def shutdown(self):
         """Shutdown the processing manager."""
@@ -84,146 +137,160 @@ class ProcessingManager:
         if self._current_job:
             await self.stop_current_job()
         
+        # Wake the processing loop so it can observe the shutdown (a full queue
+        # means the loop is busy and the cancel below stops it anyway)
+        try:
+            self._pending.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+        
         # Cancel processing task
-        if self._processing_task and not self._processing_task.done():
+        if not self._processing_task.done():
             self._processing_task.cancel()
             try:
                 await self._processing_task
             except asyncio.CancelledError:
                 logger.info("Processing task cancelled")
         
-        # Restore signal handler
-        if self._original_sigint_handler and self._original_sigint_handler != signal.SIG_DFL:
-            try:
-                signal.signal(signal.SIGINT, self._original_sigint_handler)
-            except ValueError:
-                pass
+        # Remove signal handler
+        self._restore_signal_handler()
         
         logger.info("Processing manager shutdown complete")
     
     def _generate_job_id(self) -> str:
         """Generate a unique job ID."""
         self._job_counter += 1
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return f"job_{timestamp}_{self._job_counter:04d}"
+        return f"{self._job_id_prefix}{self._job_counter:04d}"
     
     async def submit_job(self, config: ProcessingConfig) -> str:
         """Submit a new processing job."""
-        async with self._job_lock:
-            job_id = self._generate_job_id()
-            job = ProcessingJob(
-                job_id=job_id,
-                config=config,
-                status="pending",
-                start_time=datetime.now()
-            )
-            
-            self._jobs[job_id] = job
-            
-            # Start processing if no job is currently running
-            if not self._current_job:
-                await self._start_processing()
-            
-            logger.info(f"Job submitted: {job_id}")
-            return job_id
-    
-    async def _start_processing(self):
-        """Start the processing loop."""
-        if self._processing_task and not self._processing_task.done():
-            return
+        job_id = self._generate_job_id()
+        job = ProcessingJob(
+            job_id=job_id,
+            config=config,
+            status="pending"
+        )
+        job.mark_started()
         
-        self._processing_task = asyncio.create_task(self._processing_loop())
-        logger.info("Processing loop started")
+        try:
+            self._pending.put_nowait(job_id)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Too many pending jobs (limit {MAX_PENDING_JOBS})") from None
+        self._jobs[job_id] = job
+        
+        logger.info(f"Job submitted: {job_id}")
+        return job_id
     
     async def _processing_loop(self):
-        """Main processing loop."""
+        """Main processing loop, fed by the pending job queue."""
+        logger.info("Processing loop started")
         try:
             while not self._shutdown_event.is_set():
-                # Find next pending job
-                next_job = None
-                for job in self._jobs.values():
-                    if job.status == "pending":
-                        next_job = job
-                        break
+                job_id = await self._pending.get()
+                if job_id is None:
+                    # Shutdown sentinel
+                    break
                 
-                if next_job:
-                    await self._execute_job(next_job)
-                else:
-                    # No jobs to process, wait
-                    await asyncio.sleep(1)
-                    
+                job = self._jobs[job_id]
+                if job.status != "pending":
+                    continue
+                try:
+                    await self._execute_job(job)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Keep the loop alive for the jobs still queued
+                    logger.error(f"Processing loop error on {job_id}: {e}")
+        
         except asyncio.CancelledError:
             logger.info("Processing loop cancelled")
-        except Exception as e:
-            logger.error(f"Processing loop error: {e}")
     
     async def _execute_job(self, job: ProcessingJob):
         """Execute a single processing job."""
-        async with self._job_lock:
+        async with self._run_slot:
             self._current_job = job
             job.status = "running"
-            job.start_time = datetime.now()
+            job.mark_started()
         
         # Update progress tracker
-        self.progress_tracker.start_web_phase("PROCESSING", 100)
+        self.progress_tracker.start_web_phase(WebProgressPhase.PROCESSING, 100)
         
         try:
-            # Execute the actual M3U2strm3 processing
-            await self._run_m3u2strm3(job)
+            # Execute the actual M3U2strm3 processing; stop_current_job cancels this task
+            job.task = asyncio.create_task(self._run_m3u2strm3(job))
+            await job.task
             
             # Mark job as completed
-            async with self._job_lock:
-                job.status = "completed"
-                job.end_time = datetime.now()
-                job.progress = 100.0
-                
-                # Create result
-                stats = self.progress_tracker._stats
-                job.result = ProcessingResult(
-                    job_id=job.job_id,
-                    success=True,
-                    message="Processing completed successfully",
-                    stats={
-                        "movies_found": stats.movies_found,
-                        "movies_allowed": stats.movies_allowed,
-                        "movies_excluded": stats.movies_excluded,
-                        "tv_episodes_found": stats.tv_episodes_found,
-                        "tv_episodes_allowed": stats.tv_episodes_allowed,
-                        "tv_episodes_excluded": stats.tv_episodes_excluded,
-                        "documentaries_found": stats.documentaries_found,
-                        "documentaries_allowed": stats.documentaries_allowed,
-                        "documentaries_excluded": stats.documentaries_excluded,
-                        "strm_created": stats.strm_created,
-                        "strm_skipped": stats.strm_skipped,
-                        "strm_orphaned": stats.strm_orphaned,
-                    },
-                    duration=(job.end_time - job.start_time).total_seconds()
-                )
+            job.status = "completed"
+            job.mark_ended()
+            job.progress = 100.0
+            
+            # Create result
+            stats = self.progress_tracker._stats
+            job.result = ProcessingResult.model_construct(
+                job_id=job.job_id,
+                success=True,
+                message="Processing completed successfully",
+                stats={
+                    "movies_found": stats.movies_found,
+                    "movies_allowed": stats.movies_allowed,
+                    "movies_excluded": stats.movies_excluded,
+                    "tv_episodes_found": stats.tv_episodes_found,
+                    "tv_episodes_allowed": stats.tv_episodes_allowed,
+                    "tv_episodes_excluded": stats.tv_episodes_excluded,
+                    "documentaries_found": stats.documentaries_found,
+                    "documentaries_allowed": stats.documentaries_allowed,
+                    "documentaries_excluded": stats.documentaries_excluded,
+                    "strm_created": stats.strm_created,
+                    "strm_skipped": stats.strm_skipped,
+                    "strm_orphaned": stats.strm_orphaned,
+                },
+                duration=(job.end_time - job.start_time).total_seconds()
+            )
             
-            self.progress_tracker.complete_web_phase("PROCESSING", success=True)
+            self.progress_tracker.complete_web_phase(WebProgressPhase.PROCESSING, success=True)
             logger.info(f"Job completed successfully: {job.job_id}")
+        
+        except asyncio.CancelledError:
+            # Mark job as stopped (stop_current_job normally records the details)
+            job.status = "stopped"
+            if job.end_time is None:
+                job.mark_ended()
+            job.error_message = job.error_message or "Stopped by user"
+            job.result = ProcessingResult.model_construct(
+                job_id=job.job_id,
+                success=False,
+                message="Processing stopped by user",
+                stats={},
+                duration=(job.end_time - job.start_time).total_seconds() if job.start_time else 0
+            )
             
+            self.progress_tracker.reset()
+            logger.info(f"Job cancelled: {job.job_id}")
+            
+            # Let the processing loop itself wind down on shutdown
+            if self._shutdown_event.is_set():
+                raise
+        
         except Exception as e:
             # Mark job as failed
-            async with self._job_lock:
-                job.status = "failed"
-                job.end_time = datetime.now()
-                job.error_message = str(e)
-                job.result = ProcessingResult(
-                    job_id=job.job_id,
-                    success=False,
-                    message=f"Processing failed: {str(e)}",
-                    stats={},
-                    duration=(job.end_time - job.start_time).total_seconds() if job.start_time else 0
-                )
+            job.status = "failed"
+            job.mark_ended()
+            job.error_message = str(e)
+            job.result = ProcessingResult.model_construct(
+                job_id=job.job_id,
+                success=False,
+                message=f"Processing failed: {str(e)}",
+                stats={},
+                duration=(job.end_time - job.start_time).total_seconds() if job.start_time else 0
+            )
             
             self.progress_tracker.set_error(str(e))
             logger.error(f"Job failed: {job.job_id} - {e}")
         
         finally:
             # Reset current job
-            async with self._job_lock:
-                self._current_job = None
+            self._current_job = None
     
     async def _run_m3u2strm3(self, job: ProcessingJob):
         """Run the actual M3U2strm3 processing."""
@@ -232,84 +299,62 @@ class ProcessingManager:
             import main
             
             # Set up progress tracking
-            self.progress_tracker.start_web_phase("SCANNING_LOCAL", 100)
+            self.progress_tracker.start_web_phase(WebProgressPhase.SCANNING_LOCAL, 100)
             
-            # Create temporary config file
-            temp_config_path = Path("web/configs/temp_config.json")
-            temp_config_path.parent.mkdir(exist_ok=True)
+            # Run M3U2strm3 with the configuration
+            # For now, we'll simulate the processing
             
-            config_dict = job.config.dict()
-            
-            # Save temporary config
-            with open(temp_config_path, 'w') as f:
-                json.dump(config_dict, f, indent=2)
-            
-            try:
-                # Run M3U2strm3 with the configuration
-                # We need to modify the main.run_pipeline to accept a config parameter
-                # For now, we'll simulate the processing
+            # Simulate processing phases
+            loop = asyncio.get_running_loop()
+            for phase_name, duration in _PHASES:
+                self.progress_tracker.start_web_phase(phase_name, 100)
                 
-                # Simulate processing phases
-                phases = [
-                    ("SCANNING_LOCAL", 20),
-                    ("PARSING_M3U", 25),
-                    ("FILTERING_TMDB", 30),
-                    ("CREATING_STRM", 20),
-                    ("CLEANUP", 5)
-                ]
-                
-                for phase_name, duration in phases:
-                    if self._stop_requested:
-                        raise Exception("Processing stopped by user")
-                    
-                    self.progress_tracker.start_web_phase(phase_name, 100)
-                    
-                    # Simulate processing time
-                    for i in range(100):
-                        if self._stop_requested:
-                            raise Exception("Processing stopped by user")
-                        
-                        await asyncio.sleep(duration / 100)  # Sleep proportionally
-                        self.progress_tracker.update_web_phase(
-                            phase_name,
-                            progress=i + 1,
-                            processed=i + 1,
-                            total=100,
-                            current_item=f"Processing item {i + 1}",
-                            items_per_second=10.0
-                        )
+                # Simulate processing time, publishing throttled progress
+                started = loop.time()
+                progress = 0.0
+                published = 0.0
+                while progress < 100.0:
+                    await asyncio.sleep(PROGRESS_PUBLISH_INTERVAL)
+                    elapsed = loop.time() - started
+                    progress = min(100.0, elapsed / duration * 100.0)
+                    if progress - published < PROGRESS_PUBLISH_MIN_DELTA and progress < 100.0:
+                        continue
                     
-                    self.progress_tracker.complete_web_phase(phase_name, success=True)
+                    published = progress
+                    processed = int(progress)
+                    self.progress_tracker.update_web_phase(
+                        phase_name,
+                        progress=progress,
+                        processed=processed,
+                        total=100,
+                        current_item=f"Processing item {processed}",
+                        items_per_second=processed / elapsed
+                    )
                 
-                # Reset progress tracker
-                self.progress_tracker.reset()
-                
-            finally:
-                # Clean up temporary config
-                if temp_config_path.exists():
-                    temp_config_path.unlink()
-                    
+                self.progress_tracker.complete_web_phase(phase_name, success=True)
+            
+            # Reset progress tracker
+            self.progress_tracker.reset()
+        
         except Exception as e:
             logger.error(f"Error running M3U2strm3: {e}")
             raise
     
     async def stop_current_job(self):
         """Stop the current processing job."""
-        async with self._job_lock:
-            if self._current_job and self._current_job.status == "running":
-                self._stop_requested = True
-                job = self._current_job
-                job.status = "stopped"
-                job.end_time = datetime.now()
-                job.error_message = "Stopped by user"
-                
-                # Cancel the processing task
-                if job.task and not job.task.done():
-                    job.task.cancel()
-                
-                logger.info(f"Job stopped: {job.job_id}")
-                return True
-            return False
+        if self._current_job and self._current_job.status == "running":
+            job = self._current_job
+            job.status = "stopped"
+            job.mark_ended()
+            job.error_message = "Stopped by user"
+            
+            # Cancel the processing task
+            if job.task and not job.task.done():
+                job.task.cancel()
+            
+            logger.info(f"Job stopped: {job.job_id}")
+            return True
+        return False
     
     def get_current_job(self) -> Optional[Dict[str, Any]]:
         """Get information about the current job."""
@@ -319,8 +364,8 @@ class ProcessingManager:
                 "job_id": job.job_id,
                 "status": job.status,
                 "progress": job.progress,
-                "start_time": job.start_time.isoformat() if job.start_time else None,
-                "end_time": job.end_time.isoformat() if job.end_time else None,
+                "start_time": job.start_time_iso,
+                "end_time": job.end_time_iso,
                 "error_message": job.error_message,
                 "is_running": job.status == "running"
             }
@@ -328,7 +373,7 @@ class ProcessingManager:
     
     def get_queue_length(self) -> int:
         """Get the number of pending jobs."""
-        return sum(1 for job in self._jobs.values() if job.status == "pending")
+        return self._pending.qsize()
     
     def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get status of a specific job."""
@@ -338,10 +383,10 @@ class ProcessingManager:
                 "job_id": job.job_id,
                 "status": job.status,
                 "progress": job.progress,
-                "start_time": job.start_time.isoformat() if job.start_time else None,
-                "end_time": job.end_time.isoformat() if job.end_time else None,
+                "start_time": job.start_time_iso,
+                "end_time": job.end_time_iso,
                 "error_message": job.error_message,
-                "result": job.result.dict() if job.result else None
+                "result": job.result.model_dump() if job.result else None
             }
         return None
     
@@ -349,19 +394,19 @@ class ProcessingManager:
         """List all jobs."""
         jobs = []
         for job in self._jobs.values():
-            jobs.append({
+            jobs.append((job.start_time_ns, {
                 "job_id": job.job_id,
                 "status": job.status,
                 "progress": job.progress,
-                "start_time": job.start_time.isoformat() if job.start_time else None,
-                "end_time": job.end_time.isoformat() if job.end_time else None,
+                "start_time": job.start_time_iso,
+                "end_time": job.end_time_iso,
                 "error_message": job.error_message,
-                "is_current": job == self._current_job
-            })
+                "is_current": job is self._current_job
+            }))
         
         # Sort by start time, newest first
-        jobs.sort(key=lambda x: x["start_time"] or "", reverse=True)
-        return jobs
+        jobs.sort(key=lambda x: x[0], reverse=True)
+        return [info for _, info in jobs]
     
     def is_processing(self) -> bool:
         """Check if processing is currently running."""
@@ -1,11 +1,17 @@
+import functools
 import os
 from dataclasses import dataclass
 from pathlib import Path
-import json
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, FrozenSet, Optional
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
+    import json
 
-@dataclass
+
+@dataclass(slots=True)
 class Config:
     m3u: Path
     sqlite_cache_file: Path
@@ -18,11 +24,11 @@ class Config:
     allowed_movie_countries: List[str] = None
     allowed_tv_countries: List[str] = None
     write_non_us_report: bool = True
-    tv_group_keywords: List[str] = None
-    doc_group_keywords: List[str] = None
-    movie_group_keywords: List[str] = None
-    replay_group_keywords: List[str] = None
-    ignore_keywords: Dict[str, List[str]] = None
+    tv_group_keywords: FrozenSet[str] = None
+    doc_group_keywords: FrozenSet[str] = None
+    movie_group_keywords: FrozenSet[str] = None
+    replay_group_keywords: FrozenSet[str] = None
+    ignore_keywords: Dict[str, FrozenSet[str]] = None
     emby_api_url: Optional[str] = None
     emby_api_key: Optional[str] = None
     verbosity: str = "normal"  # quiet, normal, verbose, debug
@@ -36,50 +42,78 @@ def _coerce_bool(val, default=False) -> bool:
     return default
 
 
+def _group_keyword_set(keywords) -> FrozenSet[str]:
+    return frozenset(k.strip().lower() for k in keywords)
+
+
+def _ignore_keyword_sets(ignore: Dict[str, List[str]]) -> Dict[str, FrozenSet[str]]:
+    return {cat: frozenset(w.lower() for w in words or ()) for cat, words in ignore.items()}
+
+
+@functools.lru_cache(maxsize=None)
 def _detect_storage_type(path: Path) -> str:
-    """Detect if the storage is SSD or HDD based on path patterns."""
+    """Detect if the storage backing path is SSD or HDD via sysfs."""
     try:
-        # Check if path is on an SSD based on common mount points
-        mount_point = path.resolve().anchor
-        if mount_point.startswith('/dev/nvme') or mount_point.startswith('/dev/sda'):
-            return 'ssd'
-        elif mount_point.startswith('/dev/sd'):
-            return 'hdd'
+        # Walk up to the nearest existing directory (the output dir may not exist yet)
+        path = path.absolute()
+        while not path.exists() and path != path.parent:
+            path = path.parent
+        dev = os.stat(path).st_dev
+        block = Path(f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}").resolve()
+        # Partitions carry no queue/ directory; their parent disk does
+        for candidate in (block, block.parent):
+            rotational = candidate / "queue" / "rotational"
+            if rotational.exists():
+                return 'hdd' if rotational.read_text().strip() == "1" else 'ssd'
         # Default to SSD for better performance
         return 'ssd'
-    except:
+    except Exception:
         return 'ssd'
 
 
-def _optimize_max_workers(storage_type: str, cpu_count: int) -> int:
+_CPU_COUNT = os.cpu_count() or 8
+
+_MAX_WORKERS_BY_STORAGE = {
+    # SSD can handle more concurrent I/O operations
+    'ssd': min(_CPU_COUNT * 4, 32),  # Cap at 32 for very high core counts
+    # HDD benefits from fewer concurrent operations
+    'hdd': min(_CPU_COUNT * 2, 16),  # Cap at 16 for HDD
+}
+
+
+def _optimize_max_workers(storage_type: str) -> int:
     """Optimize max_workers based on storage type and CPU count."""
-    if storage_type == 'ssd':
-        # SSD can handle more concurrent I/O operations
-        return min(cpu_count * 4, 32)  # Cap at 32 for very high core counts
-    else:
-        # HDD benefits from fewer concurrent operations
-        return min(cpu_count * 2, 16)  # Cap at 16 for HDD
+    return _MAX_WORKERS_BY_STORAGE.get(storage_type, _MAX_WORKERS_BY_STORAGE['ssd'])
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    return json.loads(path.read_text(encoding="utf-8"))
 
 
 def load_config(path: Path) -> Config:
-    data = json.loads(path.read_text(encoding="utf-8"))
+    return config_from_dict(_read_json(path))
+
+
+def config_from_dict(data: Dict[str, Any]) -> Config:
     mw = data.get("max_workers")
     
     # Determine optimal max_workers if not specified or set to "auto"
     if mw is None or (isinstance(mw, str) and mw.lower() in ["auto", "max"]):
-        cpu_count = os.cpu_count() or 8
         # Use output directory to determine storage type
         output_dir = Path(data.get("output_dir", "."))
         storage_type = _detect_storage_type(output_dir)
-        mw = _optimize_max_workers(storage_type, cpu_count)
+        mw = _optimize_max_workers(storage_type)
         print(f"Auto-optimized max_workers: {mw} (detected {storage_type.upper()} storage)")
     
-    if "existing_media_dirs" in data:
-        existing_dirs = [Path(p) for p in data["existing_media_dirs"]]
-    elif "existing_media_dir" in data:
-        existing_dirs = [Path(data["existing_media_dir"])]
-    else:
-        raise KeyError("Config missing 'existing_media_dir' or 'existing_media_dirs'")
+    dirs = data.get("existing_media_dirs")
+    if dirs is None:
+        single = data.get("existing_media_dir")
+        if single is None:
+            raise KeyError("Config missing 'existing_media_dir' or 'existing_media_dirs'")
+        dirs = (single,)
+    existing_dirs = list(map(Path, dirs))
     return Config(
         m3u=Path(data["m3u"]),
         sqlite_cache_file=Path(data["sqlite_cache_file"]),
@@ -92,11 +126,11 @@ def load_config(path: Path) -> Config:
         allowed_movie_countries=data.get("allowed_movie_countries", ["US"]),
         allowed_tv_countries=data.get("allowed_tv_countries", ["US"]),
         write_non_us_report=_coerce_bool(data.get("write_non_us_report", True)),
-        tv_group_keywords=data.get("tv_group_keywords", []),
-        doc_group_keywords=data.get("doc_group_keywords", []),
-        movie_group_keywords=data.get("movie_group_keywords", []),
-        replay_group_keywords=data.get("replay_group_keywords", []),
-        ignore_keywords=data.get("ignore_keywords", {}),
+        tv_group_keywords=_group_keyword_set(data.get("tv_group_keywords") or []),
+        doc_group_keywords=_group_keyword_set(data.get("doc_group_keywords") or []),
+        movie_group_keywords=_group_keyword_set(data.get("movie_group_keywords") or []),
+        replay_group_keywords=_group_keyword_set(data.get("replay_group_keywords") or []),
+        ignore_keywords=_ignore_keyword_sets(data.get("ignore_keywords") or {}),
         emby_api_url=data.get("emby_api_url"),
         emby_api_key=data.get("emby_api_key"),
         verbosity=data.get("verbosity", "normal"),
@@ -3,8 +3,9 @@ import os
 import re
 import sqlite3
 import unicodedata
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterable, Optional, Set, Tuple
 
 YEAR_PATTERN = re.compile(r"(\(\d{4}\)).*$")
 YEAR_IN_PARENTHESES = re.compile(r"\((\d{4})\)")
@@ -68,7 +69,7 @@ def sanitize_title(title: str) -> str:
     t = re.sub(r"\s*\(\d{4}\)\s*$", "", t)
     t = re.sub(r"\s*-\s*\d{4}\s*$", "", t)
     t = re.sub(r"\s+\d{4}\s*$", "", t)
-    logging.debug(f"sanitize_title: '{original}' -> '{t}'")
+    logging.debug("sanitize_title: '%s' -> '%s'", original, t)
     return t.strip()
 
 
@@ -110,8 +111,34 @@ class SQLiteCache:
     def __init__(self, db_path: Path):
         self.conn = sqlite3.connect(str(db_path))
         self.conn.execute("PRAGMA journal_mode=WAL;")
+        # WAL only needs to fsync at checkpoints, so NORMAL is still crash-safe
+        self.conn.execute("PRAGMA synchronous=NORMAL;")
+        self.conn.execute("PRAGMA mmap_size=268435456;")
+        self.conn.execute("PRAGMA cache_size=-65536;")
+        self._in_transaction = False
         self.ensure_tables()
 
+    @contextmanager
+    def transaction(self):
+        # Writes issued inside this block share one BEGIN IMMEDIATE ... COMMIT
+        if self.conn.in_transaction:
+            self.conn.commit()
+        self.conn.execute("BEGIN IMMEDIATE")
+        self._in_transaction = True
+        try:
+            yield self
+        except BaseException:
+            self.conn.rollback()
+            raise
+        else:
+            self.conn.commit()
+        finally:
+            self._in_transaction = False
+
+    def _commit(self):
+        if not self._in_transaction:
+            self.conn.commit()
+
     def ensure_tables(self):
         self.conn.execute("""
             CREATE TABLE IF NOT EXISTS existing_media (
@@ -138,7 +165,7 @@ class SQLiteCache:
             "INSERT INTO existing_media (key, category) VALUES (?, ?)",
             ((k, v) for k, v in entries.items()),
         )
-        self.conn.commit()
+        self._commit()
 
     def existing_media_dict(self) -> Dict[str, str]:
         return {
@@ -154,6 +181,30 @@ class SQLiteCache:
             d[key] = {"url": url, "path": path, "allowed": allowed}
         return d
 
+    def get_many(
+        self, keys: Iterable[str], chunk_size: int = 500
+    ) -> Dict[str, Dict[str, Optional[str]]]:
+        # Look up only the requested keys, a bounded IN (...) list at a time
+        keys = list(keys)
+        d: Dict[str, Dict[str, Optional[str]]] = {}
+        for i in range(0, len(keys), chunk_size):
+            chunk = keys[i:i + chunk_size]
+            placeholders = ",".join("?" * len(chunk))
+            for key, url, path, allowed in self.conn.execute(
+                f"SELECT key, url, path, allowed FROM strm_cache WHERE key IN ({placeholders})",
+                chunk,
+            ):
+                d[key] = {"url": url, "path": path, "allowed": allowed}
+        return d
+
+    def strm_paths(self) -> Set[str]:
+        return {
+            row[0]
+            for row in self.conn.execute(
+                "SELECT path FROM strm_cache WHERE path IS NOT NULL AND path != ''"
+            )
+        }
+
     def replace_strm_cache(self, cache: Dict[str, Dict[str, Optional[str]]]):
         self.conn.execute("DELETE FROM strm_cache")
         rows = [
@@ -163,7 +214,34 @@ class SQLiteCache:
         self.conn.executemany(
             "INSERT INTO strm_cache (key, url, path, allowed) VALUES (?, ?, ?, ?)", rows
         )
-        self.conn.commit()
+        self._commit()
+
+    def upsert_strm_cache(
+        self,
+        updates: Dict[str, Dict[str, Optional[str]]],
+        deletions: Iterable[str] = (),
+    ):
+        # Only touch rows whose values actually changed; unchanged rows cost no page writes
+        self.conn.executemany(
+            """
+            INSERT INTO strm_cache (key, url, path, allowed) VALUES (?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                url = excluded.url,
+                path = excluded.path,
+                allowed = excluded.allowed
+            WHERE strm_cache.url IS NOT excluded.url
+                OR strm_cache.path IS NOT excluded.path
+                OR strm_cache.allowed IS NOT excluded.allowed
+            """,
+            (
+                (k, v.get("url"), v.get("path"), v.get("allowed"))
+                for k, v in updates.items()
+            ),
+        )
+        self.conn.executemany(
+            "DELETE FROM strm_cache WHERE key = ?", ((k,) for k in deletions)
+        )
+        self._commit()
 
     def update_strm(
         self, key: str, url: str, path: Optional[str], allowed: Optional[int]
@@ -172,7 +250,7 @@ class SQLiteCache:
             "INSERT OR REPLACE INTO strm_cache (key, url, path, allowed) VALUES (?, ?, ?, ?)",
             (key, url, path, allowed),
         )
-        self.conn.commit()
+        self._commit()
 
     def close(self):
         self.conn.close()
@@ -184,11 +262,11 @@ def _extract_season_episode(name: str) -> Optional[Tuple[int, int]]:
         return int(m.group(1)), int(m.group(2))
     m = re.search(r"(\d{1,2})x(\d{2})", name, re.IGNORECASE)
     if m:
-        logging.debug(f"Matched 1x01 in: {name}")
+        logging.debug("Matched 1x01 in: %s", name)
         return int(m.group(1)), int(m.group(2))
     m = re.search(r"[Ss](\d{1,2})[Ee](\d{1,2})\s*[-–]\s*[Ee](\d{1,2})", name)
     if m:
-        logging.debug(f"Matched multi-episode in: {name}")
+        logging.debug("Matched multi-episode in: %s", name)
         return int(m.group(1)), int(m.group(2))
     return None
 
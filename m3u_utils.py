@@ -1,7 +1,7 @@
 import logging, re, time, random
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict
-from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from core import _normalize_unicode, _ascii
@@ -15,8 +15,16 @@ from core import (
     extract_year,
 )
 
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional; fall back to plain substring checks
+    ahocorasick = None
 
-@dataclass
+# Below this many keywords a tuple of substring tests is cheaper than an automaton
+AHOCORASICK_MIN_KEYWORDS = 16
+
+
+@dataclass(slots=True)
 class VODEntry:
     raw_title: str
     safe_title: str
@@ -24,6 +32,10 @@ class VODEntry:
     category: "Category"
     group: Optional[str] = None
     year: Optional[int] = None
+    # (key, season, episode, base) computed once by the pipeline
+    cache_key: Optional[Tuple[str, Optional[int], Optional[int], Optional[str]]] = field(
+        default=None, repr=False, compare=False
+    )
 
 
 class Category(Enum):
@@ -37,6 +49,18 @@ class TMDbRateLimitError(Exception):
     pass
 
 
+def _keyword_matcher(keywords: Iterable[str]) -> Callable[[str], bool]:
+    # Lower-case once up front; callers pass an already lower-cased title
+    words = tuple(dict.fromkeys(w.lower() for w in keywords))
+    if ahocorasick is not None and len(words) > AHOCORASICK_MIN_KEYWORDS and "" not in words:
+        automaton = ahocorasick.Automaton()
+        for w in words:
+            automaton.add_word(w, w)
+        automaton.make_automaton()
+        return lambda text: next(automaton.iter(text), None) is not None
+    return lambda text: any(w in text for w in words)
+
+
 def parse_m3u(
     path: Path,
     tv_keywords: List[str],
@@ -44,12 +68,16 @@ def parse_m3u(
     movie_keywords: List[str],
     replay_keywords: List[str],
     ignore_keywords: Dict[str, List[str]],
-) -> List[VODEntry]:
+) -> Iterator[VODEntry]:
+    # Entries are yielded as they are parsed so huge playlists never sit in memory as a list
     movie_keywords = {k.strip().lower() for k in movie_keywords}
     tv_keywords = {k.strip().lower() for k in tv_keywords}
     doc_keywords = {k.strip().lower() for k in doc_keywords}
     replay_keywords = {k.strip().lower() for k in replay_keywords}
-    entries: List[VODEntry] = []
+    ignore_tv = _keyword_matcher(ignore_keywords.get("tvshows", []))
+    ignore_movies = _keyword_matcher(ignore_keywords.get("movies", []))
+    ignore_docs = _keyword_matcher(ignore_keywords.get("documentaries", []))
+    cat_counts: Dict[str, int] = {}
     cur_title, cur_group = None, None
     seen_groups = set()
     with path.open("r", encoding="utf-8", errors="ignore") as f:
@@ -70,7 +98,7 @@ def parse_m3u(
                     cur_group = None
             elif cur_title and line.startswith(("http://", "https://")):
                 cat = Category.MOVIE
-                group_lower = (cur_group or "").strip().lower()
+                group_lower = cur_group or ""  # already stripped and lower-cased above
                 if group_lower == "doc":
                     cat = Category.DOCUMENTARY
                 elif group_lower == "docs":
@@ -96,48 +124,37 @@ def parse_m3u(
                 title_norm = _ascii(_normalize_unicode(cur_title.lower()))
                 skip = False
                 if cat == Category.TVSHOW:
-                    for kw in ignore_keywords.get("tvshows", []):
-                        if kw.lower() in title_norm:
-                            logging.debug(f"Skipping ignored TV show: {cur_title}")
-                            skip = True
-                            break
+                    if ignore_tv(title_norm):
+                        logging.debug("Skipping ignored TV show: %s", cur_title)
+                        skip = True
                 elif cat == Category.MOVIE:
-                    for kw in ignore_keywords.get("movies", []):
-                        if kw.lower() in title_norm:
-                            logging.debug(f"Skipping ignored Movie: {cur_title}")
-                            skip = True
-                            break
+                    if ignore_movies(title_norm):
+                        logging.debug("Skipping ignored Movie: %s", cur_title)
+                        skip = True
                 elif cat == Category.DOCUMENTARY:
-                    for kw in ignore_keywords.get("documentaries", []):
-                        if kw.lower() in title_norm:
-                            logging.debug(f"Skipping ignored Documentary: {cur_title}")
-                            skip = True
-                            break
+                    if ignore_docs(title_norm):
+                        logging.debug("Skipping ignored Documentary: %s", cur_title)
+                        skip = True
                 if skip:
                     cur_title, cur_group = None, None
                     continue
                 year = extract_year(cur_title)
-                entries.append(
-                    VODEntry(
-                        raw_title=cur_title,
-                        safe_title=sanitize_title(cur_title),
-                        url=line,
-                        category=cat,
-                        group=cur_group,
-                        year=year,
-                    )
+                cat_counts[cat.value] = cat_counts.get(cat.value, 0) + 1
+                yield VODEntry(
+                    raw_title=cur_title,
+                    safe_title=sanitize_title(cur_title),
+                    url=line,
+                    category=cat,
+                    group=cur_group,
+                    year=year,
                 )
                 cur_title, cur_group = None, None
-    cat_counts: Dict[str, int] = {}
-    for e in entries:
-        cat_counts[e.category.value] = cat_counts.get(e.category.value, 0) + 1
     logging.info(
         f"M3U media scan complete - Movies: {cat_counts.get('movie', 0)}, "
         f"TV Episodes: {cat_counts.get('tvshow', 0)}, "
         f"Documentaries: {cat_counts.get('documentary', 0)}, "
         f"Replays: {cat_counts.get('replay', 0)}"
     )
-    return entries
 
 
 def _tmdb_get(url: str, api_key: str) -> Optional[dict]:
@@ -173,7 +190,7 @@ def _movie_tmdb_lookup(
         logging.error(f"TMDb request failed for {title} ({year}): {e}")
         return False
     if not data.get("results") and year:
-        logging.debug(f"TMDb: No match for '{title}' ({year}), retrying without year")
+        logging.debug("TMDb: No match for '%s' (%s), retrying without year", title, year)
         params.pop("year", None)
         try:
             resp = requests.get(base_url, params=params, timeout=10)
@@ -187,19 +204,19 @@ def _movie_tmdb_lookup(
             logging.error(f"TMDb retry (no year) failed for {title}: {e}")
             return False
     if not data.get("results"):
-        logging.debug(f"TMDb: No movie match for '{title}' ({year})")
+        logging.debug("TMDb: No movie match for '%s' (%s)", title, year)
         return False
     best = data["results"][0]
     movie_id = best.get("id")
     if not movie_id:
-        logging.debug(f"TMDb: No ID for movie '{title}' ({year})")
+        logging.debug("TMDb: No ID for movie '%s' (%s)", title, year)
         return False
     lang = best.get("original_language", "").lower()
     if lang == "ja":
-        logging.debug(f"TMDb: Excluding '{title}' ({year}) - original language Japanese")
+        logging.debug("TMDb: Excluding '%s' (%s) - original language Japanese", title, year)
         return False
     if lang == "en" and not allowed_countries:
-        logging.debug(f"TMDb: Movie '{title}' allowed by English language (no country filter)")
+        logging.debug("TMDb: Movie '%s' allowed by English language (no country filter)", title)
         return True
     release_url = f"https://api.themoviedb.org/3/movie/{movie_id}/release_dates"
     try:
@@ -210,12 +227,12 @@ def _movie_tmdb_lookup(
     results = releases.get("results", [])
     countries = {r.get("iso_3166_1") for r in results if isinstance(r, dict) and "iso_3166_1" in r}
     if any(c in allowed_countries for c in countries):
-        logging.debug(f"TMDb: Movie '{title}' allowed by release country: {countries}")
+        logging.debug("TMDb: Movie '%s' allowed by release country: %s", title, countries)
         return True
     if lang == "en":
-        logging.debug(f"TMDb: Movie '{title}' allowed by English language fallback (no allowed country match)")
+        logging.debug("TMDb: Movie '%s' allowed by English language fallback (no allowed country match)", title)
         return True
-    logging.debug(f"TMDb: Excluding movie '{title}' ({year}) - no allowed country match")
+    logging.debug("TMDb: Excluding movie '%s' (%s) - no allowed country match", title, year)
     return False
 
 
@@ -231,7 +248,7 @@ def _tv_has_allowed_network(
     search_url = f"https://api.themoviedb.org/3/search/tv?api_key={api_key}&query={query}"
     data = _tmdb_get(search_url, api_key)
     if not data or not data.get("results"):
-        logging.debug(f"TMDb: No TV match for '{query}' - excluded by default")
+        logging.debug("TMDb: No TV match for '%s' - excluded by default", query)
         return False
     results = data["results"]
     if year:
@@ -245,41 +262,41 @@ def _tv_has_allowed_network(
         best = max(results, key=lambda r: r.get("popularity", 0))
     tid = best.get("id")
     if not tid:
-        logging.debug(f"TMDb: No ID for TV show '{query}' - excluded by default")
+        logging.debug("TMDb: No ID for TV show '%s' - excluded by default", query)
         return False
     lang = best.get("original_language", "").lower()
     if lang == "ja":
-        logging.debug(f"TMDb: Excluding TV show '{query}' - original language Japanese")
+        logging.debug("TMDb: Excluding TV show '%s' - original language Japanese", query)
         return False
     if lang == "en" and not allowed_countries:
-        logging.debug(f"TMDb: TV show '{query}' allowed by English language (no country filter)")
+        logging.debug("TMDb: TV show '%s' allowed by English language (no country filter)", query)
         return True
     show_url = f"https://api.themoviedb.org/3/tv/{tid}?api_key={api_key}"
     show = _tmdb_get(show_url, api_key)
     if not show:
-        logging.debug(f"TMDb: No details for TV show '{query}' - allowing by default")
+        logging.debug("TMDb: No details for TV show '%s' - allowing by default", query)
         return True
     for network in show.get("networks", []):
         origin_countries = network.get("origin_country", [])
         if any(c in allowed_countries for c in origin_countries):
-            logging.debug(f"TMDb: TV show '{query}' allowed by network country: {origin_countries}")
+            logging.debug("TMDb: TV show '%s' allowed by network country: %s", query, origin_countries)
             return True
     prod_country_codes = [
         c.get("iso_3166_1") for c in show.get("production_countries", []) if isinstance(c, dict)
     ]
     if any(c in allowed_countries for c in prod_country_codes):
-        logging.debug(f"TMDb: TV show '{query}' allowed by production country")
+        logging.debug("TMDb: TV show '%s' allowed by production country", query)
         return True
     origin_countries = show.get("origin_country", [])
     if any(c in allowed_countries for c in origin_countries):
-        logging.debug(f"TMDb: TV show '{query}' allowed by origin country")
+        logging.debug("TMDb: TV show '%s' allowed by origin country", query)
         return True
-    logging.debug(f"TMDb: Excluding TV show '{query}' - no match for allowed countries")
+    logging.debug("TMDb: Excluding TV show '%s' - no match for allowed countries", query)
     return False
 
 
 def split_by_market_filter(
-    entries: List[VODEntry],
+    entries: Iterable[VODEntry],
     allowed_movie_countries: List[str],
     allowed_tv_countries: List[str],
     api_key: str,
@@ -292,6 +309,11 @@ def split_by_market_filter(
     logging.info(f"Filtering using {max_workers} CPU workers")
     allowed, excluded = [], []
     ignore_keywords = ignore_keywords or {}
+    ignore_matchers = {
+        Category.MOVIE: _keyword_matcher(ignore_keywords.get("movies", [])),
+        Category.TVSHOW: _keyword_matcher(ignore_keywords.get("tvshows", [])),
+        Category.DOCUMENTARY: _keyword_matcher(ignore_keywords.get("documentaries", [])),
+    }
     stats = {
         "movies_checked": 0, "movies_allowed": 0, "movies_excluded": 0,
         "tv_checked": 0, "tv_allowed": 0, "tv_excluded": 0,
@@ -312,15 +334,9 @@ def split_by_market_filter(
         return False
 
     def process_entry(e: VODEntry) -> Tuple[VODEntry, bool, str]:
-        ignore_list = []
-        if e.category == Category.MOVIE:
-            ignore_list = ignore_keywords.get("movies", [])
-        elif e.category == Category.TVSHOW:
-            ignore_list = ignore_keywords.get("tvshows", [])
-        elif e.category == Category.DOCUMENTARY:
-            ignore_list = ignore_keywords.get("documentaries", [])
-        if any(word.lower() in e.raw_title.lower() for word in ignore_list):
-            logging.debug(f"Ignored by keyword: {e.raw_title}")
+        is_ignored = ignore_matchers.get(e.category)
+        if is_ignored is not None and is_ignored(e.raw_title.lower()):
+            logging.debug("Ignored by keyword: %s", e.raw_title)
             return (e, False, "ignored")
         if e.category == Category.MOVIE:
             year = extract_year(e.raw_title)
@@ -347,6 +363,7 @@ def split_by_market_filter(
             return (e, False, "other")
 
     with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        # entries may be a live stream; lookups start as soon as each entry arrives
         futures = [ex.submit(process_entry, e) for e in entries]
         for f in tqdm(as_completed(futures), total=len(futures), desc="Filtering", unit="entry"):
             e, ok, kind = f.result()
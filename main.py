@@ -1,9 +1,13 @@
 import logging
 import re
 import concurrent.futures
+import queue
 import argparse
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, Optional, Tuple
 import requests
 import config
 from core import (
@@ -13,7 +17,6 @@ from core import (
     canonical_tv_key,
     make_cache_key,
     sanitize_title,
-    extract_year,
 )
 from m3u_utils import (
     parse_m3u,
@@ -22,15 +25,97 @@ from m3u_utils import (
     VODEntry,
 )
 from strm_utils import (
-    write_strm_file,
+    batch_write_strm_files,
     cleanup_strm_tree,
     movie_strm_path,
     tv_strm_path,
+    tv_strm_path_from_base,
     doc_strm_path,
 )
 from progress_tracker import ProgressTracker, ProgressPhase, VerbosityLevel
 from user_progress_display import UserProgressDisplay, SimpleProgressDisplay
 
+# Concurrent writers used for STRM batch writes in Phase 4
+STRM_WRITE_WORKERS = 16
+# Cache misses buffered between the playlist parser and the TMDb filter
+TMDB_QUEUE_SIZE = 1024
+# Keys looked up per strm_cache query while parsing
+CACHE_LOOKUP_BATCH = 500
+
+_SXXEXX_SEARCH = re.compile(r"[sS](\d{1,2})\s*[eE](\d{1,2})")
+
+
+def _entry_key(e: VODEntry) -> Tuple[str, Optional[int], Optional[int], Optional[str]]:
+    """Return (key, season, episode, base) for an entry; the last three are only set for SxxExx TV titles."""
+    if e.category in (Category.MOVIE, Category.DOCUMENTARY):
+        return canonical_movie_key(e.raw_title), None, None, None
+    if e.category == Category.TVSHOW:
+        m = _SXXEXX_SEARCH.search(e.raw_title)
+        if m:
+            season, episode = int(m.group(1)), int(m.group(2))
+            # Everything before the SxxExx marker is the show name
+            base = e.raw_title[:m.start()].strip()
+            return canonical_tv_key(base, season, episode), season, episode, base
+    return make_cache_key(e.raw_title), None, None, None
+
+
+@lru_cache(maxsize=8192)
+def _safe_show_title(base: str) -> str:
+    # Every episode of a show shares the same base title, so sanitize it once
+    return sanitize_title(base)
+
+
+@dataclass(slots=True)
+class WriteOp:
+    key: str
+    url: str
+    rel_path: Path
+    skip: bool
+    existing: bool
+
+
+def process_entry(e: VODEntry, output_dir: Path, existing_media, strm_cache, force_regenerate: bool) -> Optional[WriteOp]:
+    """Plan the STRM write for an allowed entry; returns None for entries that get no file."""
+    key, season, episode, base = e.cache_key
+    if not key:
+        return None
+    if e.category == Category.MOVIE:
+        rel_path = movie_strm_path(output_dir, e)
+    elif e.category == Category.TVSHOW:
+        if base is not None:
+            rel_path = tv_strm_path_from_base(
+                output_dir, base, _safe_show_title(base), e.year, season, episode
+            )
+        else:
+            rel_path = tv_strm_path(output_dir, e, 1, 1)
+    elif e.category == Category.DOCUMENTARY:
+        rel_path = doc_strm_path(output_dir, e)
+    else:
+        return None
+    existing = key in existing_media
+    skip = existing or (not force_regenerate and key in strm_cache)
+    return WriteOp(key=key, url=e.url, rel_path=rel_path, skip=skip, existing=existing)
+
+
+def _drain_queue(q: "queue.Queue[Optional[VODEntry]]") -> Iterator[VODEntry]:
+    while True:
+        item = q.get()
+        if item is None:
+            return
+        yield item
+
+
+def _put_for_filter(q: "queue.Queue[Optional[VODEntry]]", item: Optional[VODEntry], filter_future) -> None:
+    # Never block forever on a full queue if the filter thread has died
+    while True:
+        try:
+            q.put(item, timeout=1)
+            return
+        except queue.Full:
+            if filter_future.done():
+                filter_future.result()
+                return
+
 
 def touch_emby(api_url: str, api_key: str):
     try:
@@ -50,12 +135,16 @@ def write_excluded_report(path: Path, excluded, allowed_count: int, enabled: boo
         logging.info("Excluded report skipped (write_non_us_report = false)")
         return
     path.parent.mkdir(parents=True, exist_ok=True)
-    movies = [e.raw_title for e in excluded if e.category == Category.MOVIE]
-    shows = [e.raw_title for e in excluded if e.category == Category.TVSHOW]
-    grouped_shows = defaultdict(list)
-    for title in shows:
-        base = re.sub(r"[sS]\d{1,2}\s*[eE]\d{1,2}.*", "", title).strip()
-        grouped_shows[base].append(title)
+    # Single pass: split by category and group TV titles by show as we go
+    movies = []
+    grouped_shows = {}
+    for e in excluded:
+        if e.category == Category.MOVIE:
+            movies.append(e.raw_title)
+        elif e.category == Category.TVSHOW:
+            m = _SXXEXX_SEARCH.search(e.raw_title)
+            base = (e.raw_title[:m.start()] if m else e.raw_title).strip()
+            grouped_shows.setdefault(base, []).append(e.raw_title)
     with path.open("w", encoding="utf-8") as f:
         f.write("=== Excluded Entries Report ===\n\n")
         f.write(f"Total allowed: {allowed_count}\n")
@@ -72,7 +161,7 @@ def write_excluded_report(path: Path, excluded, allowed_count: int, enabled: boo
     logging.info(f"Excluded entries written: {path}")
 
 
-def run_pipeline(force_regenerate=False):
+def run_pipeline(force_regenerate=False, debug=False):
     cfg = config.load_config(Path(__file__).parent / "config.json")
     
     # Initialize progress tracking
@@ -83,6 +172,9 @@ def run_pipeline(force_regenerate=False):
         logging.warning(f"Invalid verbosity level '{cfg.verbosity}', using 'normal'")
     
     progress_tracker = ProgressTracker(verbosity=verbosity)
+    if verbosity == VerbosityLevel.QUIET:
+        # Nothing is drawn while quiet, so skip callback dispatch entirely
+        progress_tracker.set_notify_interval(float("inf"))
     
     # Initialize progress display
     try:
@@ -91,11 +183,14 @@ def run_pipeline(force_regenerate=False):
         # Fall back to simple display if tqdm fails
         progress_display = SimpleProgressDisplay(progress_tracker)
     
+    # Keep the root logger at INFO unless debugging, so per-entry debug calls are
+    # rejected by the level check before any message formatting happens
+    log_level = logging.DEBUG if debug or verbosity == VerbosityLevel.DEBUG else logging.INFO
     logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)
+    logger.setLevel(log_level)
     formatter = logging.Formatter("%(asctime)s %(levelname)s %(message)s")
     file_handler = logging.FileHandler(str(cfg.log_file), mode="a", encoding="utf-8")
-    file_handler.setLevel(logging.INFO)
+    file_handler.setLevel(log_level)
     file_handler.setFormatter(formatter)
     logging.getLogger("urllib3").setLevel(logging.WARNING)
     console_handler = logging.StreamHandler()
@@ -106,9 +201,9 @@ def run_pipeline(force_regenerate=False):
     logger.addHandler(file_handler)
     logger.addHandler(console_handler)
     m3u_path = cfg.m3u
-    output_dir = cfg.output_dir
+    # Resolve once so every STRM path below is already absolute (no per-file realpath calls)
+    output_dir = cfg.output_dir.resolve()
     db_path = cfg.sqlite_cache_file
-    ignore_keywords = cfg.ignore_keywords or {}
     write_non_us_report = cfg.write_non_us_report
     
     # Phase 1: Scanning Local Media
@@ -122,14 +217,16 @@ def run_pipeline(force_regenerate=False):
             
         cache = SQLiteCache(db_path)
         existing = {}
-        for d in cfg.existing_media_dirs:
-            existing.update(build_existing_media_cache(Path(d)))
-        cache.replace_existing_media(existing)
-        existing_keys = set(existing.keys())
+        # Each media root is an independent, I/O-bound walk, so scan them concurrently
+        scan_workers = max(1, min(8, len(cfg.existing_media_dirs)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=scan_workers) as ex:
+            for result in ex.map(build_existing_media_cache, cfg.existing_media_dirs):
+                existing.update(result)
+        existing_counts = Counter(existing.values())
         progress_tracker.update_stats(
-            movies_found=sum(1 for k, v in existing.items() if v == "MOVIE"),
-            tv_episodes_found=sum(1 for k, v in existing.items() if v == "TVEPISODE"),
-            documentaries_found=sum(1 for k, v in existing.items() if v == "DOCUMENTARY")
+            movies_found=existing_counts["MOVIE"],
+            tv_episodes_found=existing_counts["TVEPISODE"],
+            documentaries_found=existing_counts["DOCUMENTARY"]
         )
     # Phase 2: Parsing M3U Playlist
     with progress_tracker.phase_context(ProgressPhase.PARSING_M3U):
@@ -140,227 +237,127 @@ def run_pipeline(force_regenerate=False):
             logging.info("Shutdown requested during M3U parsing, exiting...")
             return
             
-        entries = parse_m3u(
-            m3u_path,
-            tv_keywords=cfg.tv_group_keywords,
-            doc_keywords=cfg.doc_group_keywords,
-            movie_keywords=cfg.movie_group_keywords,
-            replay_keywords=cfg.replay_group_keywords,
+        # TMDb lookups are network-bound, so they run on a background filter while the
+        # playlist is still being parsed; cache misses are fed to it through a bounded queue
+        tmdb_queue = queue.Queue(maxsize=TMDB_QUEUE_SIZE)
+        filter_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        filter_future = filter_pool.submit(
+            split_by_market_filter,
+            _drain_queue(tmdb_queue),
+            allowed_movie_countries=cfg.allowed_movie_countries,
+            allowed_tv_countries=cfg.allowed_tv_countries,
+            api_key=cfg.tmdb_api,
+            max_workers=cfg.max_workers,
             ignore_keywords=cfg.ignore_keywords,
         )
         
-        # Count entries by category
-        movie_count = sum(1 for e in entries if e.category == Category.MOVIE)
-        tv_count = sum(1 for e in entries if e.category == Category.TVSHOW)
-        doc_count = sum(1 for e in entries if e.category == Category.DOCUMENTARY)
-        replay_count = sum(1 for e in entries if e.category == Category.REPLAY)
-        
-        progress_tracker.update_stats(
-            movies_found=movie_count,
-            tv_episodes_found=tv_count,
-            documentaries_found=doc_count
-        )
+        # Stream the playlist, counting and deduplicating each entry as it is parsed.
+        # A later duplicate replaces the earlier entry but keeps its position.
+        cats = Counter()
+        unique = {}
+        strm_cache = {}
+        reused_allowed_keys = []
+        reused_excluded_keys = []
+        pending = []
+        to_check_count = 0
         
-        # Deduplicate entries
-        unique_entries = {}
-        for e in entries:
-            if e.category == Category.MOVIE:
-                key = canonical_movie_key(e.raw_title)
-            elif e.category == Category.TVSHOW:
-                m = re.search(r"[sS](\d{1,2})\s*[eE](\d{1,2})", e.raw_title)
-                if m:
-                    season, episode = int(m.group(1)), int(m.group(2))
-                    base = re.sub(r"[sS]\d{1,2}\s*[eE]\d{1,2}.*", "", e.raw_title).strip()
-                    key = canonical_tv_key(base, season, episode)
+        def flush_pending():
+            # Classify a batch of first-seen keys with one cache query; misses go to TMDb
+            queued = 0
+            strm_cache.update(cache.get_many(pending))
+            for key in pending:
+                e = unique[key]
+                cached = strm_cache.get(key)
+                if cached and cached.get("allowed") is not None:
+                    if cached["allowed"] == 1:
+                        reused_allowed_keys.append(key)
+                        logging.debug("Reusing cached allowed result for %s", e.raw_title)
+                    else:
+                        reused_excluded_keys.append(key)
+                        logging.debug("Reusing cached excluded result for %s", e.raw_title)
                 else:
-                    key = make_cache_key(e.raw_title)
-            elif e.category == Category.DOCUMENTARY:
-                key = canonical_movie_key(e.raw_title)
-            else:
-                key = make_cache_key(e.raw_title)
-            unique_entries[key] = e
+                    logging.debug("CACHE MISS: raw_title=%r key=%s cached_entry=%s", e.raw_title, key, cached)
+                    _put_for_filter(tmdb_queue, e, filter_future)
+                    queued += 1
+            pending.clear()
+            return queued
         
-        entries = list(unique_entries.values())
-        progress_tracker.update_phase(ProgressPhase.PARSING_M3U, len(entries), f"Parsed {len(entries)} unique entries")
-        logging.info("Deduplicated playlist entries: %d -> %d unique", len(entries), len(unique_entries))
-    strm_cache = cache.strm_cache_dict()
-    logging.debug("Loaded %d entries from strm_cache", len(strm_cache))
-    to_check = []
-    reused_allowed = []
-    reused_excluded = []
-    for e in entries:
-        key = None
-        if e.category == Category.MOVIE:
-            key = canonical_movie_key(e.raw_title)
-        elif e.category == Category.TVSHOW:
-            m = re.search(r"[sS](\d{1,2})\s*[eE](\d{1,2})", e.raw_title)
-            if m:
-                season, episode = int(m.group(1)), int(m.group(2))
-                base = re.sub(r"[sS]\d{1,2}\s*[eE]\d{1,2}.*", "", e.raw_title).strip()
-                key = canonical_tv_key(base, season, episode)
-            else:
-                key = make_cache_key(e.raw_title)
-        elif e.category == Category.DOCUMENTARY:
-            key = canonical_movie_key(e.raw_title)
-        else:
-            key = make_cache_key(e.raw_title)
-        if key in existing_keys:
-            reused_allowed.append(e)
-            logging.debug(f"Reusing local-existing result for {e.raw_title}")
-            continue
-        cached = strm_cache.get(key)
-        if cached and cached.get("allowed") is not None:
-            if cached["allowed"] == 1:
-                reused_allowed.append(e)
-                logging.debug(f"Reusing cached allowed result for {e.raw_title}")
-            else:
-                reused_excluded.append(e)
-                logging.debug(f"Reusing cached excluded result for {e.raw_title}")
-        else:
-            logging.debug("CACHE MISS: raw_title=%r key=%s cached_entry=%s", e.raw_title, key, strm_cache.get(key))
-            to_check.append(e)
+        try:
+            for e in parse_m3u(
+                m3u_path,
+                tv_keywords=cfg.tv_group_keywords,
+                doc_keywords=cfg.doc_group_keywords,
+                movie_keywords=cfg.movie_group_keywords,
+                replay_keywords=cfg.replay_group_keywords,
+                ignore_keywords=cfg.ignore_keywords,
+            ):
+                cats[e.category] += 1
+                e.cache_key = _entry_key(e)
+                key = e.cache_key[0]
+                first_seen = key not in unique
+                unique[key] = e
+                if not first_seen:
+                    continue
+                if key in existing:
+                    reused_allowed_keys.append(key)
+                    logging.debug("Reusing local-existing result for %s", e.raw_title)
+                    continue
+                pending.append(key)
+                if len(pending) >= CACHE_LOOKUP_BATCH:
+                    to_check_count += flush_pending()
+            if pending:
+                to_check_count += flush_pending()
+        finally:
+            _put_for_filter(tmdb_queue, None, filter_future)
+        logging.debug("Loaded %d matching entries from strm_cache", len(strm_cache))
+        
+        progress_tracker.update_stats(
+            movies_found=cats[Category.MOVIE],
+            tv_episodes_found=cats[Category.TVSHOW],
+            documentaries_found=cats[Category.DOCUMENTARY]
+        )
+        progress_tracker.update_phase(ProgressPhase.PARSING_M3U, len(unique), f"Parsed {len(unique)} unique entries")
+        logging.info("Deduplicated playlist entries: %d -> %d unique", sum(cats.values()), len(unique))
     # Phase 3: TMDb Filtering
     with progress_tracker.phase_context(ProgressPhase.FILTERING_TMDB):
-        progress_tracker.start_phase(ProgressPhase.FILTERING_TMDB, total_items=len(to_check))
+        progress_tracker.start_phase(ProgressPhase.FILTERING_TMDB, total_items=to_check_count)
         
         # Check for shutdown request
         if progress_tracker.is_shutdown_requested():
             logging.info("Shutdown requested during TMDb filtering, exiting...")
+            filter_pool.shutdown(wait=False)
             return
         
-        allowed, excluded = split_by_market_filter(
-            to_check,
-            allowed_movie_countries=cfg.allowed_movie_countries,
-            allowed_tv_countries=cfg.allowed_tv_countries,
-            api_key=cfg.tmdb_api,
-            max_workers=cfg.max_workers,
-            ignore_keywords=cfg.ignore_keywords,
-        )
+        # Wait for the lookups still in flight once parsing has finished
+        try:
+            checked_allowed, checked_excluded = filter_future.result()
+        finally:
+            filter_pool.shutdown()
         
-        # Update statistics with filtering results
-        allowed.extend(reused_allowed)
-        excluded.extend(reused_excluded)
+        # Lookups ran on the first copy of each key; report the entry that won deduplication
+        allowed = [unique[e.cache_key[0]] for e in checked_allowed]
+        excluded = [unique[e.cache_key[0]] for e in checked_excluded]
+        allowed.extend(unique[key] for key in reused_allowed_keys)
+        excluded.extend(unique[key] for key in reused_excluded_keys)
         
         # Count results by category
-        allowed_movies = sum(1 for e in allowed if e.category == Category.MOVIE)
-        allowed_tv = sum(1 for e in allowed if e.category == Category.TVSHOW)
-        allowed_docs = sum(1 for e in allowed if e.category == Category.DOCUMENTARY)
-        
-        excluded_movies = sum(1 for e in excluded if e.category == Category.MOVIE)
-        excluded_tv = sum(1 for e in excluded if e.category == Category.TVSHOW)
-        excluded_docs = sum(1 for e in excluded if e.category == Category.DOCUMENTARY)
-        
+        allowed_cats = Counter(e.category for e in allowed)
+        excluded_cats = Counter(e.category for e in excluded)
         progress_tracker.update_stats(
-            movies_allowed=allowed_movies,
-            movies_excluded=excluded_movies,
-            tv_episodes_allowed=allowed_tv,
-            tv_episodes_excluded=excluded_tv,
-            documentaries_allowed=allowed_docs,
-            documentaries_excluded=excluded_docs
+            movies_allowed=allowed_cats[Category.MOVIE],
+            movies_excluded=excluded_cats[Category.MOVIE],
+            tv_episodes_allowed=allowed_cats[Category.TVSHOW],
+            tv_episodes_excluded=excluded_cats[Category.TVSHOW],
+            documentaries_allowed=allowed_cats[Category.DOCUMENTARY],
+            documentaries_excluded=excluded_cats[Category.DOCUMENTARY]
         )
         
-        progress_tracker.update_phase(ProgressPhase.FILTERING_TMDB, len(to_check), 
+        progress_tracker.update_phase(ProgressPhase.FILTERING_TMDB, to_check_count, 
                                     f"Filtered {len(allowed)} allowed, {len(excluded)} excluded")
     
     write_excluded_report(output_dir / "excluded_entries.txt", excluded, len(allowed), write_non_us_report)
-    existing_keys = set(existing.keys())
-    strm_cache = cache.strm_cache_dict()
-    new_cache = strm_cache.copy()
-    written_count = 0
-    skipped_count = 0
-
-    def process_entry(e):
-        nonlocal written_count, skipped_count
-        key = None
-        rel_path = None
-        logging.debug(
-            "PROCESS START: raw_title=%r, safe_title=%r, category=%s, year=%s, url=%s",
-            getattr(e, "raw_title", None),
-            getattr(e, "safe_title", None),
-            getattr(e, "category", None),
-            getattr(e, "year", None),
-            getattr(e, "url", None),
-        )
-        if not e.year:
-            e.year = extract_year(e.raw_title)
-            if e.year:
-                logging.debug("Extracted year=%s from raw_title %r", e.year, e.raw_title)
-        ignore = ignore_keywords.get("tvshows" if e.category == Category.TVSHOW else "movies", [])
-        if any(word.lower() in e.raw_title.lower() for word in ignore):
-            logging.debug("Ignored by keyword: %s", e.raw_title)
-            return
-        try:
-            if e.category == Category.MOVIE:
-                key = canonical_movie_key(e.raw_title)
-                logging.debug(f"Key built for {e.raw_title} (MOVIE): {key}")
-                rel_path = movie_strm_path(output_dir, e)
-            elif e.category == Category.TVSHOW:
-                base = re.sub(r"[sS]\d{1,2}\s*[eE]\d{1,2}.*", "", e.raw_title).strip()
-                m = re.search(r"[sS](\d{1,2})\s*[eE](\d{1,2})", e.raw_title)
-                if m:
-                    season, episode = int(m.group(1)), int(m.group(2))
-                    key = canonical_tv_key(base, season, episode)
-                    logging.debug(f"Key built for {e.raw_title} (TVSHOW S{season:02d}E{episode:02d}): {key}")
-                    rel_path = tv_strm_path(
-                        output_dir,
-                        VODEntry(
-                            raw_title=base,
-                            safe_title=sanitize_title(base),
-                            url=e.url,
-                            category=e.category,
-                            year=e.year,
-                        ),
-                        season,
-                        episode,
-                    )
-                else:
-                    key = make_cache_key(e.raw_title)
-                    logging.debug(f"Key built for {e.raw_title} (TVSHOW no S/E): {key}")
-                    rel_path = tv_strm_path(output_dir, e, 1, 1)
-            elif e.category == Category.DOCUMENTARY:
-                key = canonical_movie_key(e.raw_title)
-                logging.debug(f"Key built for {e.raw_title} (DOC): {key}")
-                rel_path = doc_strm_path(output_dir, e)
-            else:
-                logging.warning("Unknown category %s for entry %r", e.category, e.raw_title)
-                return
-            if not key:
-                logging.error("No cache key generated for %r", e.raw_title)
-                return
-            abs_path = rel_path
-            url = e.url
-            if key in existing_keys:
-                skipped_count += 1
-                logging.debug("Skip existing media: %s", e.raw_title)
-                new_cache[key] = {"url": e.url, "path": None, "allowed": 1}
-                return
-            # Skip cache check if force_regenerate is enabled
-            if not force_regenerate:
-                cached = strm_cache.get(key)
-                if cached:
-                    cached_path = Path(cached.get("path") or "").resolve() if cached.get("path") else None
-                    if cached.get("url") == url and cached.get("path") and cached_path == abs_path.resolve():
-                        skipped_count += 1
-                        logging.debug("Skip cached (unchanged): %s", e.raw_title)
-                        new_cache[key] = {
-                            "url": cached.get("url"),
-                            "path": cached.get("path"),
-                            "allowed": cached.get("allowed", 1),
-                        }
-                        return
-            write_strm_file(output_dir, rel_path, url)
-            new_cache[key] = {"url": url, "path": str(abs_path.resolve()), "allowed": 1}
-            written_count += 1
-            logging.info("STRM written: %s", abs_path)
-        except Exception as ex:
-            logging.error(
-                "Error processing entry %r (category=%s, year=%s): %s",
-                e.raw_title,
-                getattr(e, "category", None),
-                getattr(e, "year", None),
-                ex,
-                exc_info=True,
-            )
+    # Only rows touched this run are written back to strm_cache
+    updates = {}
 
     # Phase 4: Creating STRM Files
     with progress_tracker.phase_context(ProgressPhase.CREATING_STRM):
@@ -374,116 +371,69 @@ def run_pipeline(force_regenerate=False):
         
         # First pass: determine which files need to be created
         for e in allowed:
-            key = None
-            rel_path = None
             try:
-                if e.category == Category.MOVIE:
-                    key = canonical_movie_key(e.raw_title)
-                    rel_path = movie_strm_path(output_dir, e)
-                elif e.category == Category.TVSHOW:
-                    base = re.sub(r"[sS]\d{1,2}\s*[eE]\d{1,2}.*", "", e.raw_title).strip()
-                    m = re.search(r"[sS](\d{1,2})\s*[eE](\d{1,2})", e.raw_title)
-                    if m:
-                        season, episode = int(m.group(1)), int(m.group(2))
-                        key = canonical_tv_key(base, season, episode)
-                        rel_path = tv_strm_path(
-                            output_dir,
-                            VODEntry(
-                                raw_title=base,
-                                safe_title=sanitize_title(base),
-                                url=e.url,
-                                category=e.category,
-                                year=e.year,
-                            ),
-                            season,
-                            episode,
-                        )
-                    else:
-                        key = make_cache_key(e.raw_title)
-                        rel_path = tv_strm_path(output_dir, e, 1, 1)
-                elif e.category == Category.DOCUMENTARY:
-                    key = canonical_movie_key(e.raw_title)
-                    rel_path = doc_strm_path(output_dir, e)
-                else:
-                    continue
+                op = process_entry(e, output_dir, existing, strm_cache, force_regenerate)
+            except Exception as ex:
+                progress_tracker.add_error(f"Error processing {e.raw_title}: {str(ex)}")
+                continue
+            if op is None:
+                continue
+            if op.skip:
+                skipped_count += 1
+            else:
+                file_operations.append(op)
+        
+        # Process files in optimized batches; STRM writes are tiny syscall-bound I/O, so use threads
+        with concurrent.futures.ThreadPoolExecutor(max_workers=STRM_WRITE_WORKERS) as strm_writer:
+            for i in range(0, len(file_operations), batch_size):
+                batch = file_operations[i:i + batch_size]
                 
-                if not key:
-                    continue
+                # Extract just the paths and URLs for batch processing
+                batch_ops = [(op.rel_path, op.url) for op in batch]
                 
-                # Check if already exists or cached
-                if key in existing_keys or (not force_regenerate and key in strm_cache):
-                    skipped_count += 1
-                    continue
+                # Process batch
+                batch_written, batch_skipped = batch_write_strm_files(output_dir, batch_ops, executor=strm_writer)
+                written_count += batch_written
+                skipped_count += batch_skipped
                 
-                # Add to batch operations
-                file_operations.append((rel_path, e.url, key, e))
+                # Update cache for successfully written files
+                for op in batch:
+                    updates[op.key] = {"url": op.url, "path": str(output_dir / op.rel_path), "allowed": 1}
                 
-            except Exception as ex:
-                progress_tracker.add_error(f"Error processing {e.raw_title}: {str(ex)}")
-        
-        # Process files in optimized batches
-        for i in range(0, len(file_operations), batch_size):
-            batch = file_operations[i:i + batch_size]
-            
-            # Extract just the paths and URLs for batch processing
-            batch_ops = [(rel_path, url) for rel_path, url, key, entry in batch]
-            
-            # Process batch
-            batch_written, batch_skipped = batch_write_strm_files(output_dir, batch_ops)
-            written_count += batch_written
-            skipped_count += batch_skipped
-            
-            # Update cache for successfully written files
-            for rel_path, url, key, entry in batch:
-                abs_path = output_dir / rel_path
-                new_cache[key] = {"url": url, "path": str(abs_path.resolve()), "allowed": 1}
-            
-            # Update progress (less frequent updates for better performance)
-            current_processed = min(i + batch_size, len(file_operations))
-            progress_tracker.batch_update_phase(
-                ProgressPhase.CREATING_STRM, 
-                current_processed + skipped_count,
-                f"Batch {i//batch_size + 1}/{(len(file_operations)-1)//batch_size + 1}",
-                success_count=batch_written,
-                skipped_count=batch_skipped
-            )
-            
-            # Update statistics
-            movie_count = sum(1 for _, _, _, entry in batch if entry.category == Category.MOVIE)
-            tv_count = sum(1 for _, _, _, entry in batch if entry.category == Category.TVSHOW)
-            doc_count = sum(1 for _, _, _, entry in batch if entry.category == Category.DOCUMENTARY)
-            
-            progress_tracker.update_stats(
-                strm_created=batch_written,
-                strm_skipped=batch_skipped
-            )
+                # Update progress (less frequent updates for better performance)
+                current_processed = min(i + batch_size, len(file_operations))
+                progress_tracker.batch_update_phase(
+                    ProgressPhase.CREATING_STRM, 
+                    current_processed + skipped_count,
+                    f"Batch {i//batch_size + 1}/{(len(file_operations)-1)//batch_size + 1}",
+                    success_count=batch_written,
+                    skipped_count=batch_skipped
+                )
+                
+                # Update statistics
+                progress_tracker.update_stats(
+                    strm_created=batch_written,
+                    strm_skipped=batch_skipped
+                )
         
         # Process excluded entries
         for e in excluded:
-            if e.category in (Category.MOVIE, Category.DOCUMENTARY):
-                key = canonical_movie_key(e.raw_title)
-            elif e.category == Category.TVSHOW:
-                m = re.search(r"[sS](\d{1,2})\s*[eE](\d{1,2})", e.raw_title)
-                if m:
-                    season, episode = int(m.group(1)), int(m.group(2))
-                    base = re.sub(r"[sS]\d{1,2}\s*[eE]\d{1,2}.*", "", e.raw_title).strip()
-                    key = canonical_tv_key(base, season, episode)
-                else:
-                    key = make_cache_key(e.raw_title)
-            else:
-                key = make_cache_key(e.raw_title)
-            new_cache[key] = {"url": e.url, "path": None, "allowed": 0}
+            key = e.cache_key[0]
+            updates[key] = {"url": e.url, "path": None, "allowed": 0}
         
         progress_tracker.update_phase(ProgressPhase.CREATING_STRM, len(allowed), 
                                     f"Created {written_count} STRMs, skipped {skipped_count}")
     
-    cache.replace_strm_cache(new_cache)
+    # Persist both tables in a single write transaction (one commit, one WAL sync)
+    with cache.transaction():
+        cache.replace_existing_media(existing)
+        cache.upsert_strm_cache(updates)
     
     # Phase 5: Cleanup & Finalization
     with progress_tracker.phase_context(ProgressPhase.CLEANUP):
         progress_tracker.start_phase(ProgressPhase.CLEANUP)
         logging.info("Cleaning up orphan STRMs...")
-        cleanup_strm_tree(output_dir, new_cache)
+        cleanup_strm_tree(output_dir, cache.strm_paths())
         
         # Count orphaned files (this would need to be tracked in cleanup_strm_tree)
         progress_tracker.update_phase(ProgressPhase.CLEANUP, 1, "Cleanup completed")
@@ -494,6 +444,10 @@ def run_pipeline(force_regenerate=False):
         else:
             logging.info("Skipping Emby refresh (either dry_run or not configured)")
     
+    # Stop callback dispatch so no progress redraw lands after the summary
+    progress_tracker.cleanup()
+    progress_display.cleanup()
+    
     # Show final summary
     progress_display.show_final_summary()
 
@@ -505,5 +459,10 @@ if __name__ == "__main__":
         action="store_true",
         help="Force regeneration of all STRM files, skipping cache checks",
     )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Write DEBUG-level messages to the log file",
+    )
     args = parser.parse_args()
-    run_pipeline(force_regenerate=args.force_regenerate)
+    run_pipeline(force_regenerate=args.force_regenerate, debug=args.debug)
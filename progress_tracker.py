@@ -1,13 +1,60 @@
+import copy
 import time
 import threading
-from typing import Dict, List, Optional, Callable, Any
-from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Callable, Any, Tuple
+from dataclasses import dataclass, field, fields
 from enum import Enum
 from contextlib import contextmanager
 import logging
 import signal
 import sys
 
+# Rates and throttles use the monotonic clock; time.time() is kept for wall-clock stamps
+_monotonic = time.monotonic
+
+# Longest current-item label kept on a PhaseProgress
+MAX_CURRENT_ITEM_LEN = 100
+
+
+class ReadWriteLock:
+    """Lock allowing many concurrent readers or one writer; waiting writers take priority."""
+    
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+    
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+    
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
 class ProgressPhase(Enum):
     SCANNING_LOCAL = "Scanning Local Media"
     PARSING_M3U = "Parsing M3U Playlist"
@@ -16,19 +63,33 @@ class ProgressPhase(Enum):
     CLEANUP = "Cleanup & Finalization"
 
 
-@dataclass
+@dataclass(slots=True)
 class PhaseProgress:
     phase: ProgressPhase
     total: int = 0
     processed: int = 0
     started_at: Optional[float] = None
     completed_at: Optional[float] = None
-    items_per_second: float = 0.0
+    started_monotonic: Optional[float] = None
+    completed_monotonic: Optional[float] = None
     current_item: str = ""
     success_count: int = 0
     failure_count: int = 0
     skipped_count: int = 0
     
+    def reset(self, total: int = 0):
+        """Restart this phase in place instead of allocating a new PhaseProgress."""
+        self.total = total
+        self.processed = 0
+        self.started_at = time.time()
+        self.started_monotonic = _monotonic()
+        self.completed_at = None
+        self.completed_monotonic = None
+        self.current_item = ""
+        self.success_count = 0
+        self.failure_count = 0
+        self.skipped_count = 0
+    
     @property
     def is_complete(self) -> bool:
         return self.completed_at is not None
@@ -40,6 +101,15 @@ class PhaseProgress:
         end_time = self.completed_at or time.time()
         return end_time - self.started_at
     
+    @property
+    def items_per_second(self) -> float:
+        # Derived on read, so per-item updates don't pay for a clock call and a division
+        if self.started_monotonic is None:
+            return 0.0
+        end = self.completed_monotonic if self.completed_monotonic is not None else _monotonic()
+        elapsed = end - self.started_monotonic
+        return self.processed / elapsed if elapsed > 0 else 0.0
+    
     @property
     def progress_percent(self) -> float:
         if self.total == 0:
@@ -54,7 +124,12 @@ class VerbosityLevel(Enum):
     DEBUG = "debug"      # All logs + progress
 
 
-@dataclass
+# Verbosity levels that show phase progress, and those that also show details
+LOG_VERBOSITIES = frozenset({VerbosityLevel.NORMAL, VerbosityLevel.VERBOSE, VerbosityLevel.DEBUG})
+DETAIL_VERBOSITIES = frozenset({VerbosityLevel.VERBOSE, VerbosityLevel.DEBUG})
+
+
+@dataclass(slots=True)
 class ProcessingStats:
     movies_found: int = 0
     movies_allowed: int = 0
@@ -83,19 +158,44 @@ class ProcessingStats:
         return (self.movies_excluded + self.tv_episodes_excluded + self.documentaries_excluded)
 
 
+# Counter fields update_stats() accepts; anything else is ignored
+_STATS_INT_FIELDS = frozenset(f.name for f in fields(ProcessingStats) if f.type is int)
+
+
 class ProgressTracker:
     """Thread-safe progress tracking system for M3U2strm3 operations."""
     
     def __init__(self, verbosity: VerbosityLevel = VerbosityLevel.NORMAL):
         self.verbosity = verbosity
-        self._lock = threading.RLock()  # Use RLock to prevent deadlocks from nested lock acquisition
+        self._log_enabled = verbosity in LOG_VERBOSITIES
+        # Guards the phase table, current phase and callback registration. It is read on
+        # every UI poll but only written when phases start or callbacks register
+        self._lock = ReadWriteLock()
         self._phases: Dict[ProgressPhase, PhaseProgress] = {}
+        # Each phase and the stats get their own lock so concurrent updates don't serialize
+        self._phase_locks: Dict[ProgressPhase, threading.Lock] = {}
+        self._stats_lock = threading.Lock()
         self._current_phase: Optional[ProgressPhase] = None
         self._stats = ProcessingStats()
+        # Per-thread running totals; only the owning thread writes to its buffer
+        self._tls = threading.local()
+        self._local_stats: List[Dict[str, int]] = []
         self._start_time = time.time()
-        self._callbacks: List[Callable[[Any], None]] = []
-        self._shutdown_flag = threading.Event()  # Flag to signal shutdown
+        # Copy-on-write: registration swaps in a new tuple, so readers need no lock
+        self._callbacks: Tuple[Callable[[Any], None], ...] = ()
+        # The dispatcher runs callbacks at most once per interval, always ending
+        # on the latest state; only the dispatcher thread touches _last_notify
+        self._last_notify = 0.0
+        self._notify_interval = 0.1
+        # One long-lived dispatcher runs callbacks; ticks between wakeups coalesce
+        self._cv = threading.Condition()
+        self._dirty = False
+        self._force_dispatch = False
+        self._dispatcher: Optional[threading.Thread] = None
+        # Only ever flips False -> True; a plain attribute write is atomic under the GIL
+        self._shutdown_requested = False
         self._original_sigint_handler = None  # Store original SIGINT handler
+        self._signal_restored = False
         self._setup_signal_handlers()
     
     def _setup_signal_handlers(self):
@@ -110,68 +210,79 @@ class ProgressTracker:
     def _handle_shutdown(self, signum, frame):
         """Handle shutdown signals gracefully."""
         logging.info("Shutdown signal received, initiating graceful shutdown...")
-        self._shutdown_flag.set()
-        
-        # Restore original signal handler
-        if self._original_sigint_handler and self._original_sigint_handler != signal.SIG_DFL:
-            signal.signal(signal.SIGINT, self._original_sigint_handler)
+        self._shutdown_requested = True
+        self._restore_signal()
         
         # Force immediate exit after cleanup
         sys.exit(0)
     
+    def _restore_signal(self):
+        """Restore the original SIGINT handler, at most once."""
+        if self._signal_restored:
+            return
+        self._signal_restored = True
+        if self._original_sigint_handler and self._original_sigint_handler != signal.SIG_DFL:
+            try:
+                signal.signal(signal.SIGINT, self._original_sigint_handler)
+            except ValueError:
+                pass  # Can only set signal handlers from main thread
+    
     def is_shutdown_requested(self) -> bool:
         """Check if shutdown has been requested."""
-        return self._shutdown_flag.is_set()
+        return self._shutdown_requested
     
     def shutdown(self):
         """Initiate graceful shutdown."""
         logging.info("Initiating graceful shutdown...")
-        self._shutdown_flag.set()
+        self._shutdown_requested = True
+        self._restore_signal()
+        self._stop_dispatcher()
     
     def cleanup(self):
         """Clean up resources and finalize progress tracking."""
-        # Ensure shutdown flag is set
-        self._shutdown_flag.set()
-        
-        # Restore original signal handler if it was set
-        if self._original_sigint_handler and self._original_sigint_handler != signal.SIG_DFL:
-            try:
-                signal.signal(signal.SIGINT, self._original_sigint_handler)
-            except ValueError:
-                pass  # Can only set signal handlers from main thread
+        self._shutdown_requested = True
+        self._restore_signal()
+        self._stop_dispatcher()
         
         logging.debug("Progress tracker cleanup completed")
         
     def set_verbosity(self, verbosity: VerbosityLevel):
         """Change verbosity level during execution."""
-        with self._lock:
+        with self._lock.write():
             self.verbosity = verbosity
+            self._log_enabled = verbosity in LOG_VERBOSITIES
     
     def start_phase(self, phase: ProgressPhase, total_items: int = 0):
         """Start a new processing phase."""
-        with self._lock:
+        with self._lock.write():
             if phase not in self._phases:
                 self._phases[phase] = PhaseProgress(phase=phase, total=total_items)
+                self._phase_locks[phase] = threading.Lock()
             progress = self._phases[phase]
-            progress.started_at = time.time()
-            progress.total = total_items
-            progress.processed = 0
-            progress.current_item = ""
+            phase_lock = self._phase_locks[phase]
             self._current_phase = phase
+        
+        with phase_lock:
+            progress.reset(total_items)
             
-            if self.verbosity in [VerbosityLevel.NORMAL, VerbosityLevel.VERBOSE, VerbosityLevel.DEBUG]:
-                logging.info(f"Starting phase: {phase.value} (total: {total_items})")
+            if self._log_enabled:
+                logging.info("Starting phase: %s (total: %d)", phase.value, total_items)
+        
+        self._notify_callbacks(force=True)
     
     def update_phase(self, phase: ProgressPhase, processed: int, current_item: str = "", 
                     success: bool = True, skipped: bool = False):
         """Update progress for a specific phase."""
-        with self._lock:
-            if phase not in self._phases:
-                return
-                
+        phase_lock = self._phase_locks.get(phase)
+        if phase_lock is None:
+            return
+        
+        with phase_lock:
             progress = self._phases[phase]
             progress.processed = processed
-            progress.current_item = current_item[:100]  # Limit item name length
+            if len(current_item) > MAX_CURRENT_ITEM_LEN:  # Limit item name length
+                current_item = current_item[:MAX_CURRENT_ITEM_LEN]
+            progress.current_item = current_item
             
             if success:
                 progress.success_count += 1
@@ -180,142 +291,196 @@ class ProgressTracker:
                 
             if skipped:
                 progress.skipped_count += 1
-            
-            # Calculate items per second
-            if progress.started_at:
-                elapsed = time.time() - progress.started_at
-                if elapsed > 0:
-                    progress.items_per_second = processed / elapsed
-            
-            # Notify callbacks
-            self._notify_callbacks()
+        
+        # Notify callbacks
+        self._notify_callbacks()
     
     def batch_update_phase(self, phase: ProgressPhase, processed: int, current_item: str = "", 
                           success_count: int = 0, failure_count: int = 0, skipped_count: int = 0):
         """Batch update progress for better performance during high-frequency updates."""
-        with self._lock:
-            if phase not in self._phases:
-                return
-                
+        phase_lock = self._phase_locks.get(phase)
+        if phase_lock is None:
+            return
+        
+        with phase_lock:
             progress = self._phases[phase]
             progress.processed = processed
-            progress.current_item = current_item[:100] if current_item else progress.current_item
+            if current_item:
+                if len(current_item) > MAX_CURRENT_ITEM_LEN:
+                    current_item = current_item[:MAX_CURRENT_ITEM_LEN]
+                progress.current_item = current_item
             progress.success_count += success_count
             progress.failure_count += failure_count
             progress.skipped_count += skipped_count
-            
-            # Calculate items per second
-            if progress.started_at:
-                elapsed = time.time() - progress.started_at
-                if elapsed > 0:
-                    progress.items_per_second = processed / elapsed
-            
-            # Notify callbacks (less frequent for batched updates)
-            self._notify_callbacks()
+        
+        # Notify callbacks (less frequent for batched updates)
+        self._notify_callbacks()
     
     def complete_phase(self, phase: ProgressPhase):
         """Mark a phase as complete."""
-        with self._lock:
+        phase_lock = self._phase_locks.get(phase)
+        if phase_lock is None:
+            return
+        
+        with phase_lock:
             if phase in self._phases:
                 self._phases[phase].completed_at = time.time()
-                if self.verbosity in [VerbosityLevel.NORMAL, VerbosityLevel.VERBOSE, VerbosityLevel.DEBUG]:
+                self._phases[phase].completed_monotonic = _monotonic()
+                if self._log_enabled:
                     progress = self._phases[phase]
-                    elapsed = progress.elapsed_time
-                    logging.info(f"Completed phase: {phase.value} in {elapsed:.1f}s "
-                               f"({progress.processed} items, {progress.items_per_second:.1f}/s)")
+                    logging.info("Completed phase: %s in %.1fs (%d items, %.1f/s)",
+                                 phase.value, progress.elapsed_time,
+                                 progress.processed, progress.items_per_second)
+        
+        # Publish this phase's per-thread stat totals
+        self._merge_local_stats()
+        
+        # Show the final count right away rather than after the next throttled tick
+        self._notify_callbacks(force=True)
     
     def update_stats(self, **kwargs):
         """Update processing statistics."""
-        with self._lock:
-            for key, value in kwargs.items():
-                if hasattr(self._stats, key):
-                    setattr(self._stats, key, getattr(self._stats, key) + value)
-            self._notify_callbacks()
+        # Writers only touch their own thread-local buffer, so no lock is taken here
+        buf = self._local_stats_buffer()
+        for key, value in kwargs.items():
+            if key in _STATS_INT_FIELDS:
+                buf[key] = buf.get(key, 0) + value
+        self._notify_callbacks()
+    
+    def _local_stats_buffer(self) -> Dict[str, int]:
+        """Return the calling thread's stats buffer, registering it on first use."""
+        buf = getattr(self._tls, "stats", None)
+        if buf is None:
+            buf = self._tls.stats = {}
+            with self._stats_lock:
+                self._local_stats.append(buf)
+        return buf
+    
+    def _merge_local_stats(self):
+        """Sum every thread's running totals into the shared ProcessingStats."""
+        with self._stats_lock:
+            totals: Dict[str, int] = {}
+            for buf in self._local_stats:
+                # dict.copy() is a single C call, so it can't see a half-applied update
+                for key, value in buf.copy().items():
+                    totals[key] = totals.get(key, 0) + value
+            stats = self._stats
+            for key, value in totals.items():
+                setattr(stats, key, value)
     
     def add_error(self, error_msg: str):
         """Add an error to the statistics."""
-        with self._lock:
+        with self._stats_lock:
             self._stats.errors.append(error_msg)
     
     def get_phase_progress(self, phase: ProgressPhase) -> Optional[PhaseProgress]:
         """Get progress information for a specific phase."""
-        with self._lock:
-            return self._phases.get(phase)
+        phase_lock = self._phase_locks.get(phase)
+        if phase_lock is None:
+            return None
+        with phase_lock:
+            # Hand out a consistent snapshot rather than the live, still-mutating object
+            return copy.copy(self._phases[phase])
     
     def get_current_phase(self) -> Optional[PhaseProgress]:
         """Get progress information for the current phase."""
-        with self._lock:
-            if self._current_phase:
-                return self._phases.get(self._current_phase)
+        with self._lock.read():
+            phase = self._current_phase
+        if phase is None:
             return None
+        return self.get_phase_progress(phase)
     
     def get_overall_progress(self) -> float:
         """Calculate overall progress across all phases."""
-        with self._lock:
-            if not self._phases:
-                return 0.0
-            
-            total_weight = len(self._phases)
-            progress_sum = sum(p.progress_percent for p in self._phases.values())
-            return progress_sum / total_weight
+        # Copy the raw counters under the lock and do the arithmetic after releasing it
+        with self._lock.read():
+            snapshot = [
+                (p.processed, p.total, p.completed_at is not None)
+                for p in self._phases.values()
+            ]
+        if not snapshot:
+            return 0.0
+        
+        progress_sum = sum(
+            min(100.0, processed / total * 100.0) if total else (100.0 if complete else 0.0)
+            for processed, total, complete in snapshot
+        )
+        return progress_sum / len(snapshot)
     
     def get_stats(self) -> ProcessingStats:
         """Get current processing statistics."""
-        with self._lock:
+        self._merge_local_stats()
+        with self._stats_lock:
             return self._stats
     
     def get_elapsed_time(self) -> float:
         """Get total elapsed time since start."""
-        try:
-            with self._lock:
-                return time.time() - self._start_time
-        except Exception:
-            # Fallback if lock is held by another thread
-            return time.time() - self._start_time
+        # _start_time never changes after __init__, so no lock is needed
+        return time.time() - self._start_time
     
     def register_callback(self, callback: Callable[[Any], None]):
         """Register a callback to be notified of progress updates."""
-        with self._lock:
-            self._callbacks.append(callback)
+        with self._lock.write():
+            self._callbacks = self._callbacks + (callback,)
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch_loop, name="progress-callbacks", daemon=True
+                )
+                self._dispatcher.start()
+    
+    def set_notify_interval(self, seconds: float):
+        """Set the minimum time between callback notifications (inf disables them)."""
+        self._notify_interval = seconds
     
-    def _notify_callbacks(self):
+    def _notify_callbacks(self, force: bool = False):
         """Notify all registered callbacks of progress updates."""
-        # Use a short timeout to prevent callbacks from blocking indefinitely
-        callbacks_to_notify = []
-        with self._lock:
-            callbacks_to_notify = self._callbacks.copy()
-        
-        for callback in callbacks_to_notify:
-            try:
+        if self._notify_interval == float("inf"):
+            return
+        # Lock-free fast path: the dispatcher clears _dirty before reading
+        # state, so a pending dispatch will already pick up this update
+        if not self._callbacks or (self._dirty and not force):
+            return
+        with self._cv:
+            self._dirty = True
+            if force:
+                self._force_dispatch = True
+            self._cv.notify()
+    
+    def _dispatch_loop(self):
+        """Run callbacks on the dispatcher thread whenever progress has changed."""
+        while True:
+            with self._cv:
+                self._cv.wait_for(lambda: self._dirty or self._shutdown_requested)
+                # Wait out the rest of the interval so updates inside it coalesce
+                # into one trailing dispatch of the latest state
+                remaining = self._last_notify + self._notify_interval - _monotonic()
+                if remaining > 0:
+                    self._cv.wait_for(
+                        lambda: self._force_dispatch or self._shutdown_requested, remaining
+                    )
+                if self._shutdown_requested:
+                    return
+                self._dirty = False
+                self._force_dispatch = False
+            self._last_notify = _monotonic()
+            
+            for callback in self._callbacks:
                 # Check if shutdown is requested before executing callback
-                if self._shutdown_flag.is_set():
-                    break
-                    
-                # Execute callback with timeout protection
-                import threading
-                result = [None]
-                exception = [None]
-                
-                def callback_wrapper():
-                    try:
-                        result[0] = callback(self)
-                    except Exception as e:
-                        exception[0] = e
-                
-                thread = threading.Thread(target=callback_wrapper)
-                thread.daemon = True
-                thread.start()
-                thread.join(timeout=1.0)  # 1 second timeout for callback execution
-                
-                if exception[0]:
-                    logging.debug(f"Callback execution failed: {exception[0]}")
-                elif thread.is_alive():
-                    logging.debug("Callback execution timed out")
-                    
-            except Exception as e:
-                logging.debug(f"Error in callback notification: {e}")
-                # Don't let callback errors break progress tracking
-                pass
+                if self._shutdown_requested:
+                    return
+                try:
+                    callback(self)
+                except Exception as e:
+                    # Don't let callback errors break progress tracking
+                    logging.debug("Callback execution failed: %s", e)
+    
+    def _stop_dispatcher(self):
+        """Wake the dispatcher so it sees the shutdown flag and exits."""
+        with self._cv:
+            self._cv.notify_all()
+        dispatcher = self._dispatcher
+        if dispatcher is not None and dispatcher is not threading.current_thread():
+            dispatcher.join(timeout=1.0)
     
     @contextmanager
     def phase_context(self, phase: ProgressPhase, total_items: int = 0):
@@ -328,9 +493,10 @@ class ProgressTracker:
     
     def get_summary(self) -> str:
         """Generate a user-friendly summary of all operations."""
-        with self._lock:
+        self._merge_local_stats()
+        with self._stats_lock:
             stats = self._stats
-            total_time = self.get_elapsed_time()
+            total_time = time.time() - self._start_time
             
             summary = [
                 "✅ Processing Complete!",
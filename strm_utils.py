@@ -2,8 +2,9 @@ import logging
 import os
 import re
 import shutil
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import Dict, Optional, TYPE_CHECKING, List, Tuple
+from typing import Iterable, Optional, TYPE_CHECKING, List, Tuple
 from core import extract_year
 
 if TYPE_CHECKING:
@@ -16,7 +17,7 @@ def write_strm_file(base_dir: Path, relative_path: Path, url: str) -> Path:
         try:
             old = target.read_text(encoding="utf-8", errors="ignore").strip()
             if old.strip().lower() == url.strip().lower():
-                logging.debug(f"STRM unchanged, skip: {target}")
+                logging.debug("STRM unchanged, skip: %s", target)
                 return target
         except Exception as e:
             logging.warning(f"Error reading existing STRM {target}: {e}")
@@ -31,20 +32,45 @@ def write_strm_file(base_dir: Path, relative_path: Path, url: str) -> Path:
     return target
 
 
-def batch_write_strm_files(base_dir: Path, file_operations: List[Tuple[Path, str]]) -> Tuple[int, int]:
+def _write_strm_if_changed(target: Path, url: str) -> Optional[bool]:
+    """Write a single STRM; returns True if written, False if unchanged, None on failure."""
+    try:
+        if target.exists():
+            try:
+                old = target.read_text(encoding="utf-8", errors="ignore").strip()
+                if old.lower() == url.strip().lower():
+                    logging.debug("STRM unchanged, skip: %s", target)
+                    return False
+            except Exception as e:
+                logging.warning(f"Error reading existing STRM {target}: {e}")
+        
+        with target.open("w", encoding="utf-8") as f:
+            f.write(url.strip() + "\n")
+        logging.info(f"STRM written: {target}")
+        return True
+        
+    except Exception as e:
+        logging.error(f"Failed to write STRM {target}: {e}")
+        # Continue processing other files instead of raising
+        return None
+
+
+def batch_write_strm_files(
+    base_dir: Path,
+    file_operations: List[Tuple[Path, str]],
+    executor: Optional[Executor] = None,
+) -> Tuple[int, int]:
     """
     Batch write multiple STRM files efficiently.
     
     Args:
         base_dir: Base directory for STRM files
         file_operations: List of (relative_path, url) tuples
+        executor: Optional thread pool used to issue the file writes concurrently
         
     Returns:
         Tuple of (written_count, skipped_count)
     """
-    written_count = 0
-    skipped_count = 0
-    
     # Group operations by parent directory for efficient mkdir
     dir_operations = {}
     for relative_path, url in file_operations:
@@ -60,38 +86,24 @@ def batch_write_strm_files(base_dir: Path, file_operations: List[Tuple[Path, str
         parent_dir.mkdir(parents=True, exist_ok=True)
     
     # Process files in batches
-    for parent_dir, operations in dir_operations.items():
-        for target, url in operations:
-            try:
-                if target.exists():
-                    try:
-                        old = target.read_text(encoding="utf-8", errors="ignore").strip()
-                        if old.strip().lower() == url.strip().lower():
-                            skipped_count += 1
-                            logging.debug(f"STRM unchanged, skip: {target}")
-                            continue
-                    except Exception as e:
-                        logging.warning(f"Error reading existing STRM {target}: {e}")
-                
-                with target.open("w", encoding="utf-8") as f:
-                    f.write(url.strip() + "\n")
-                written_count += 1
-                logging.info(f"STRM written: {target}")
-                
-            except Exception as e:
-                logging.error(f"Failed to write STRM {target}: {e}")
-                # Continue processing other files instead of raising
+    targets = [op for operations in dir_operations.values() for op in operations]
+    if executor is not None:
+        results = list(executor.map(lambda op: _write_strm_if_changed(*op), targets))
+    else:
+        results = [_write_strm_if_changed(target, url) for target, url in targets]
     
+    written_count = sum(1 for r in results if r is True)
+    skipped_count = sum(1 for r in results if r is False)
     return written_count, skipped_count
 
 
-def cleanup_strm_tree(base_dir: Path, cache: Dict[str, Dict[str, str]]):
+def cleanup_strm_tree(base_dir: Path, cached_paths: Iterable[str]):
     if not base_dir.exists():
         return
-    if not cache:
+    valid_paths = {Path(p) for p in cached_paths if p}
+    if not valid_paths:
         logging.warning("Cache is empty — skipping cleanup to avoid deleting everything.")
         return
-    valid_paths = {Path(d.get("path")) for d in cache.values() if d.get("path")}
     removed_files = 0
     removed_dirs = 0
     protected_roots = {"Movies", "TV Shows", "Documentaries"}
@@ -103,7 +115,7 @@ def cleanup_strm_tree(base_dir: Path, cache: Dict[str, Dict[str, str]]):
                 try:
                     strm_path.unlink()
                     removed_files += 1
-                    logging.debug(f"Removed orphan STRM: {strm_path}")
+                    logging.debug("Removed orphan STRM: %s", strm_path)
                 except Exception as e:
                     logging.error(f"Failed to remove orphan STRM {strm_path}: {e}")
         if dirp.name in protected_roots:
@@ -115,11 +127,11 @@ def cleanup_strm_tree(base_dir: Path, cache: Dict[str, Dict[str, str]]):
             if not files and not subdirs:
                 dirp.rmdir()
                 removed_dirs += 1
-                logging.debug(f"Removed empty directory: {dirp}")
+                logging.debug("Removed empty directory: %s", dirp)
             elif files and all(f.suffix.lower() == ".nfo" for f in files) and not subdirs:
                 shutil.rmtree(dirp)
                 removed_dirs += 1
-                logging.debug(f"Removed NFO-only directory: {dirp}")
+                logging.debug("Removed NFO-only directory: %s", dirp)
         except Exception as e:
             logging.error(f"Error checking directory {dirp}: {e}")
     if removed_files or removed_dirs:
@@ -139,8 +151,21 @@ def movie_strm_path(base_dir: Path, entry: "VODEntry") -> Path:
 
 
 def tv_strm_path(base_dir: Path, entry: "VODEntry", season: int, episode: int) -> Path:
-    series_clean = entry.safe_title
-    year = entry.year or extract_year(entry.raw_title)
+    return tv_strm_path_from_base(
+        base_dir, entry.raw_title, entry.safe_title, entry.year, season, episode
+    )
+
+
+def tv_strm_path_from_base(
+    base_dir: Path,
+    base: str,
+    safe_base: str,
+    year: Optional[int],
+    season: int,
+    episode: int,
+) -> Path:
+    series_clean = safe_base
+    year = year or extract_year(base)
     if year:
         folder = f"{series_clean} ({year})"
         fn = f"{series_clean} ({year}) S{season:02d}E{episode:02d}"
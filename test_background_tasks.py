@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for ProcessingManager signal handling.
+"""
+
+import asyncio
+import os
+import signal
+
+from background_tasks import ProcessingManager
+from utils.web_progress_tracker import WebProgressTracker
+
+
+def test_second_sigint_reaches_previous_handler():
+    """The first SIGINT stops the job; the next one goes to the server's handler."""
+    received = []
+
+    def server_handler(signum, frame):
+        received.append(signum)
+
+    original = signal.signal(signal.SIGINT, server_handler)
+    try:
+        async def scenario():
+            manager = ProcessingManager(WebProgressTracker(), None)
+            stopped = []
+
+            async def fake_stop():
+                stopped.append(True)
+                return False
+
+            manager.stop_current_job = fake_stop
+
+            os.kill(os.getpid(), signal.SIGINT)
+            await asyncio.sleep(0.05)
+            assert stopped == [True]
+            assert received == []
+            assert signal.getsignal(signal.SIGINT) is server_handler
+
+            os.kill(os.getpid(), signal.SIGINT)
+            await asyncio.sleep(0.05)
+            assert received == [signal.SIGINT]
+            assert stopped == [True]
+
+            await manager.shutdown()
+            assert signal.getsignal(signal.SIGINT) is server_handler
+
+        asyncio.run(scenario())
+    finally:
+        signal.signal(signal.SIGINT, original)
+
+
+if __name__ == "__main__":
+    test_second_sigint_reaches_previous_handler()
+    print("✅ Signal handling test passed")
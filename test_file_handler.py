@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for FileHandler configuration caching.
+"""
+
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+
+from utils.file_handler import FileHandler, _DEFAULT_CONFIG
+
+
+def test_nested_config_edits_do_not_leak_between_loads():
+    """Mutating a nested value in one loaded config leaves the next load untouched."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        handler = FileHandler(upload_dir=str(Path(temp_dir, "uploads")),
+                              config_dir=str(Path(temp_dir, "configs")))
+
+        async def scenario():
+            # Defaults only, then a saved file served from the parse cache
+            first = await handler.load_config()
+            first["existing_media_dirs"].append("/media/leak")
+            first["ignore_keywords"]["movies"].append("leak")
+            assert _DEFAULT_CONFIG["existing_media_dirs"] == []
+
+            assert await handler.save_config({**(await handler.load_config()), "m3u": "list.m3u",
+                                              "tmdb_api": "key", "output_dir": "out"})
+            cached = await handler.load_config()
+            cached["allowed_movie_countries"].append("FR")
+            cached["ignore_keywords"]["tvshows"].clear()
+
+            again = await handler.load_config()
+            assert again["existing_media_dirs"] == []
+            assert "leak" not in again["ignore_keywords"]["movies"]
+            assert again["allowed_movie_countries"] == ["US", "GB", "CA"]
+            assert again["ignore_keywords"]["tvshows"] == ["ufc", "wwe", "pokemon"]
+
+            assert await handler.save_config_preset("nested", {"ignore_keywords": {"movies": ["a"]}})
+            preset = await handler.load_config_preset("nested")
+            preset["ignore_keywords"]["movies"].append("b")
+            assert (await handler.load_config_preset("nested"))["ignore_keywords"]["movies"] == ["a"]
+
+        asyncio.run(scenario())
+
+
+def test_unparseable_config_falls_back_to_defaults():
+    """A config.json rewritten with bad content stops serving the old cached body."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        handler = FileHandler(upload_dir=str(Path(temp_dir, "uploads")),
+                              config_dir=str(Path(temp_dir, "configs")))
+        config_file = Path(temp_dir, "configs", "config.json")
+
+        def rewrite(content, mtime_ns):
+            # Explicit mtimes so coarse filesystem timestamps cannot hide a rewrite
+            config_file.write_text(content)
+            os.utime(config_file, ns=(mtime_ns, mtime_ns))
+
+        async def scenario():
+            defaults_body, defaults_etag = await handler.load_config_json()
+            rewrite('{"m3u": "list.m3u"}', 1_000_000_000)
+            _, saved_etag = await handler.load_config_json()
+            assert saved_etag != defaults_etag
+
+            for mtime, content in enumerate(("{not json", "[1, 2]"), start=2):
+                rewrite(content, mtime * 1_000_000_000)
+                assert await handler.load_config_json() == (defaults_body, defaults_etag)
+                assert (await handler.load_config())["m3u"] == ""
+                assert config_file not in handler._config_cache
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_nested_config_edits_do_not_leak_between_loads()
+    test_unparseable_config_falls_back_to_defaults()
+    print("✅ Config cache tests passed")
@@ -16,9 +16,8 @@ def create_test_entries(count: int = 100):
     """Create test file operations for performance testing."""
     entries = []
     for i in range(count):
-        rel_path = Path(f"Movies/Test Movie {i:03d}/Test Movie {i:03d}.strm")
-        url = f"http://example.com/stream/{i}"
-        entries.append((rel_path, url))
+        name = f"Test Movie {i:03d}"
+        entries.append((Path("Movies", name, name + ".strm"), f"http://example.com/stream/{i}"))
     return entries
 
 
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for ProgressTracker callback dispatch.
+"""
+
+import threading
+import time
+
+from progress_tracker import ProgressTracker, ProgressPhase, VerbosityLevel
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_burst_of_updates_ends_on_final_count():
+    """Updates inside the throttle interval coalesce into a trailing dispatch."""
+    tracker = ProgressTracker(verbosity=VerbosityLevel.QUIET)
+    phase = ProgressPhase.CREATING_STRM
+    seen = []
+    lock = threading.Lock()
+
+    def callback(t):
+        with lock:
+            seen.append(t.get_phase_progress(phase).processed)
+
+    try:
+        tracker.set_notify_interval(0.5)
+        tracker.register_callback(callback)
+        tracker.start_phase(phase, 1000)
+        assert _wait_for(lambda: bool(seen))
+
+        # Everything below lands inside the interval opened by the dispatch above
+        for i in range(1000):
+            tracker.update_phase(phase, i + 1, f"Item {i + 1}")
+
+        assert _wait_for(lambda: seen[-1] == 1000)
+        # The burst was throttled rather than dispatched once per update
+        assert len(seen) < 100
+    finally:
+        tracker.cleanup()
+
+
+def test_complete_phase_dispatches_immediately():
+    """complete_phase publishes without waiting out the throttle interval."""
+    tracker = ProgressTracker(verbosity=VerbosityLevel.QUIET)
+    tracker.set_notify_interval(60.0)
+    phase = ProgressPhase.PARSING_M3U
+    completed = threading.Event()
+
+    def callback(t):
+        progress = t.get_phase_progress(phase)
+        if progress is not None and progress.completed_at is not None:
+            completed.set()
+
+    try:
+        tracker.register_callback(callback)
+        tracker.start_phase(phase, 10)
+        for i in range(10):
+            tracker.update_phase(phase, i + 1)
+        tracker.complete_phase(phase)
+
+        assert completed.wait(1.0)
+    finally:
+        tracker.cleanup()
+
+
+if __name__ == "__main__":
+    test_burst_of_updates_ends_on_final_count()
+    test_complete_phase_dispatches_immediately()
+    print("✅ Progress dispatch tests passed")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tests for the web API request validation.
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from web.app import app, get_file_handler, get_processing_manager, _send_until_disconnect
+
+
+def test_malformed_config_body_is_rejected_with_422():
+    """A body that is not JSON gets a 422, not a 500 from encoding the error."""
+    app.dependency_overrides[get_file_handler] = lambda: None
+    app.dependency_overrides[get_processing_manager] = lambda: None
+    try:
+        client = TestClient(app)
+        for path in ("/api/config", "/api/process"):
+            response = client.post(path, content=b"not json",
+                                   headers={"content-type": "application/json"})
+            assert response.status_code == 422, path
+            assert response.json()["detail"]
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_idle_websocket_notices_disconnect():
+    """A client leaving is noticed even while the sender has nothing to send."""
+    class IdleSocket:
+        async def receive(self):
+            await asyncio.sleep(0.01)
+            return {"type": "websocket.disconnect", "code": 1001}
+
+    async def idle_sender():
+        await asyncio.Event().wait()
+
+    async def scenario():
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            await asyncio.wait_for(_send_until_disconnect(IdleSocket(), idle_sender), 1.0)
+        assert exc_info.value.code == 1001
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_malformed_config_body_is_rejected_with_422()
+    test_idle_websocket_notices_disconnect()
+    print("✅ Web app tests passed")
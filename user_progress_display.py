@@ -2,7 +2,10 @@ import sys
 import time
 from typing import Optional, Dict, Any
 from tqdm import tqdm
-from progress_tracker import ProgressTracker, ProgressPhase, VerbosityLevel, PhaseProgress
+from progress_tracker import ProgressTracker, ProgressPhase, VerbosityLevel, PhaseProgress, LOG_VERBOSITIES, DETAIL_VERBOSITIES
+
+_ITEM_DISPLAY_LEN = 50
+_ELLIPSIS_CUT = _ITEM_DISPLAY_LEN - 3
 
 
 class UserProgressDisplay:
@@ -12,8 +15,9 @@ class UserProgressDisplay:
         self.tracker = tracker
         self._tqdm_bar: Optional[tqdm] = None
         self._current_phase_bar: Optional[tqdm] = None
-        self._last_update_time = 0
-        self._update_interval = 0.5  # Update display every 500ms
+        # (phase, total, started_at) the phase bar was built for
+        self._bar_key: Optional[tuple] = None
+        self._last_postfix: Optional[tuple] = None
         
         # Register callback to receive progress updates
         self.tracker.register_callback(self._on_progress_update)
@@ -24,14 +28,10 @@ class UserProgressDisplay:
         if self.tracker.is_shutdown_requested():
             return
             
-        if self.tracker.verbosity not in [VerbosityLevel.NORMAL, VerbosityLevel.VERBOSE, VerbosityLevel.DEBUG]:
-            return
-            
-        current_time = time.time()
-        if current_time - self._last_update_time < self._update_interval:
+        if self.tracker.verbosity not in LOG_VERBOSITIES:
             return
             
-        self._last_update_time = current_time
+        # tqdm throttles redraws itself (mininterval/miniters on the bar)
         self._update_display()
     
     def _update_display(self):
@@ -44,29 +44,42 @@ class UserProgressDisplay:
             return
         
         # Update phase-specific progress bar
-        if self._current_phase_bar is None or self._current_phase_bar.desc != current_phase.phase.value:
+        # Rebuild when the phase changes or is restarted, e.g. with its real total
+        bar_key = (current_phase.phase, current_phase.total, current_phase.started_at)
+        if self._current_phase_bar is None or self._bar_key != bar_key:
             if self._current_phase_bar:
                 self._current_phase_bar.close()
+            self._bar_key = bar_key
             self._current_phase_bar = tqdm(
                 total=current_phase.total,
                 desc=f"Processing: {current_phase.phase.value}",
                 unit="items",
                 leave=False,
                 dynamic_ncols=True,
+                # Redraws are throttled by time alone so small or slow phases still move
+                mininterval=0.5,
+                miniters=1,
                 bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}] {postfix}'
             )
+            self._last_postfix = None
         
-        # Update progress
-        self._current_phase_bar.n = current_phase.processed
-        self._current_phase_bar.set_postfix({
-            'Current': current_phase.current_item[:50] + '...' if len(current_phase.current_item) > 50 else current_phase.current_item,
-            'Speed': f"{current_phase.items_per_second:.1f}/s"
-        })
-        self._current_phase_bar.refresh()
+        # Update progress; postfix is drawn along with the next throttled update
+        item = current_phase.current_item
+        rate = round(current_phase.items_per_second, 1)
+        postfix = (item, rate)
+        if postfix != self._last_postfix:
+            self._last_postfix = postfix
+            self._current_phase_bar.set_postfix({
+                'Current': item if len(item) <= _ITEM_DISPLAY_LEN else item[:_ELLIPSIS_CUT] + '...',
+                'Speed': f"{rate:.1f}/s"
+            }, refresh=False)
+        delta = current_phase.processed - self._current_phase_bar.n
+        if delta:
+            self._current_phase_bar.update(delta)
     
     def show_phase_summary(self, phase: ProgressPhase):
         """Show a summary when a phase completes."""
-        if self.tracker.verbosity not in [VerbosityLevel.NORMAL, VerbosityLevel.VERBOSE, VerbosityLevel.DEBUG]:
+        if self.tracker.verbosity not in LOG_VERBOSITIES:
             return
             
         elapsed = phase.elapsed_time
@@ -81,7 +94,7 @@ class UserProgressDisplay:
     
     def show_overall_progress(self):
         """Show overall progress across all phases."""
-        if self.tracker.verbosity not in [VerbosityLevel.NORMAL, VerbosityLevel.VERBOSE, VerbosityLevel.DEBUG]:
+        if self.tracker.verbosity not in LOG_VERBOSITIES:
             return
             
         overall_progress = self.tracker.get_overall_progress()
@@ -96,7 +109,7 @@ class UserProgressDisplay:
     
     def show_statistics(self):
         """Show current processing statistics."""
-        if self.tracker.verbosity not in [VerbosityLevel.VERBOSE, VerbosityLevel.DEBUG]:
+        if self.tracker.verbosity not in DETAIL_VERBOSITIES:
             return
             
         stats = self.tracker.get_stats()
@@ -149,13 +162,13 @@ class SimpleProgressDisplay:
         self.tracker = tracker
         self._last_phase = None
         self._last_processed = 0
-        self._last_time = time.time()
+        self._last_time = time.monotonic()
         
         self.tracker.register_callback(self._on_progress_update)
     
     def _on_progress_update(self, tracker: ProgressTracker):
         """Simple progress update for basic terminals."""
-        if self.tracker.verbosity not in [VerbosityLevel.NORMAL, VerbosityLevel.VERBOSE, VerbosityLevel.DEBUG]:
+        if self.tracker.verbosity not in LOG_VERBOSITIES:
             return
             
         current_phase = self.tracker.get_current_phase()
@@ -163,7 +176,7 @@ class SimpleProgressDisplay:
             return
         
         # Only update every second to avoid spam
-        current_time = time.time()
+        current_time = time.monotonic()
         if current_time - self._last_time < 1.0:
             return
         
@@ -186,7 +199,7 @@ class SimpleProgressDisplay:
     
     def show_phase_complete(self, phase: ProgressPhase):
         """Show phase completion message."""
-        if self.tracker.verbosity not in [VerbosityLevel.NORMAL, VerbosityLevel.VERBOSE, VerbosityLevel.DEBUG]:
+        if self.tracker.verbosity not in LOG_VERBOSITIES:
             return
             
         print(f"\n✅ {phase.phase.value} completed ({phase.processed} items in {phase.elapsed_time:.1f}s)")
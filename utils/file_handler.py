@@ -3,22 +3,159 @@ File handling utilities for M3U2strm3 Web Interface.
 Handles file uploads, configuration management, and file validation.
 """
 
+import asyncio
+import copy
 import os
+import re
 import json
 import shutil
 import hashlib
+import time
+import uuid
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from types import MappingProxyType
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
 from datetime import datetime
 import logging
+import aiofiles
 from slugify import slugify
 
+try:
+    from blake3 import blake3
+except ImportError:  # blake3 is optional; fall back to hashlib's SHA-256
+    blake3 = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder/parser
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Uploads are copied to disk in pieces of this size, so memory stays flat
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Fields a saved configuration cannot leave empty
+_REQUIRED_FIELDS = ("m3u", "sqlite_cache_file", "log_file", "output_dir", "tmdb_api")
+
+# ISO 3166-1 alpha-2 country codes
+_ISO3166_ALPHA2 = frozenset({
+    "AD", "AE", "AF", "AG", "AI", "AL", "AM", "AO", "AQ", "AR", "AS", "AT", "AU", "AW", "AX", "AZ",
+    "BA", "BB", "BD", "BE", "BF", "BG", "BH", "BI", "BJ", "BL", "BM", "BN", "BO", "BQ", "BR", "BS", "BT", "BV", "BW", "BY", "BZ",
+    "CA", "CC", "CD", "CF", "CG", "CH", "CI", "CK", "CL", "CM", "CN", "CO", "CR", "CU", "CV", "CW", "CX", "CY", "CZ",
+    "DE", "DJ", "DK", "DM", "DO", "DZ",
+    "EC", "EE", "EG", "EH", "ER", "ES", "ET",
+    "FI", "FJ", "FK", "FM", "FO", "FR",
+    "GA", "GB", "GD", "GE", "GF", "GG", "GH", "GI", "GL", "GM", "GN", "GP", "GQ", "GR", "GS", "GT", "GU", "GW", "GY",
+    "HK", "HM", "HN", "HR", "HT", "HU",
+    "ID", "IE", "IL", "IM", "IN", "IO", "IQ", "IR", "IS", "IT",
+    "JE", "JM", "JO", "JP",
+    "KE", "KG", "KH", "KI", "KM", "KN", "KP", "KR", "KW", "KY", "KZ",
+    "LA", "LB", "LC", "LI", "LK", "LR", "LS", "LT", "LU", "LV", "LY",
+    "MA", "MC", "MD", "ME", "MF", "MG", "MH", "MK", "ML", "MM", "MN", "MO", "MP", "MQ", "MR", "MS", "MT", "MU", "MV", "MW", "MX", "MY", "MZ",
+    "NA", "NC", "NE", "NF", "NG", "NI", "NL", "NO", "NP", "NR", "NU", "NZ",
+    "OM",
+    "PA", "PE", "PF", "PG", "PH", "PK", "PL", "PM", "PN", "PR", "PS", "PT", "PW", "PY",
+    "QA",
+    "RE", "RO", "RS", "RU", "RW",
+    "SA", "SB", "SC", "SD", "SE", "SG", "SH", "SI", "SJ", "SK", "SL", "SM", "SN", "SO", "SR", "SS", "ST", "SV", "SX", "SY", "SZ",
+    "TC", "TD", "TF", "TG", "TH", "TJ", "TK", "TL", "TM", "TN", "TO", "TR", "TT", "TV", "TW", "TZ",
+    "UA", "UG", "UM", "US", "UY", "UZ",
+    "VA", "VC", "VE", "VG", "VI", "VN", "VU",
+    "WF", "WS",
+    "YE", "YT",
+    "ZA", "ZM", "ZW",
+})
+
+# Playlist names may only use ASCII letters, digits, '-', '_' and '.'
+_M3U_FILENAME = re.compile(r"[A-Za-z0-9_.\-]*\.m3u8?", re.IGNORECASE)
+
+
+def _upload_hasher():
+    """Return the hasher used to fingerprint uploads (BLAKE3 when available)."""
+    if blake3 is not None:
+        return blake3(max_threads=blake3.AUTO)
+    return hashlib.sha256()
+
+
+@lru_cache(maxsize=256)
+def _slug(name: str) -> str:
+    # The same few preset and playlist names are slugified over and over
+    return slugify(name, allow_unicode=False)
+
+
+def _read_json(path: Path) -> Any:
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _dumps_compact(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _check_required_fields(config: Any):
+    # Accepts a plain dict or a model object exposing the fields as attributes
+    for field in _REQUIRED_FIELDS:
+        value = config.get(field) if isinstance(config, dict) else getattr(config, field, None)
+        if not value:
+            raise ValueError(f"Missing required field: {field}")
+
+
+def _write_bytes_atomic(path: Path, raw: bytes):
+    # Readers never see a half-written file: write a sibling, then rename over
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(raw)
+    os.replace(tmp_path, path)
+
+
+def _write_json(path: Path, data: Any):
+    if orjson is not None:
+        # orjson emits UTF-8 without escaping, matching ensure_ascii=False
+        raw = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        raw = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    _write_bytes_atomic(path, raw)
+
+
+# Configuration defaults, shared by every FileHandler and merged under loaded configs;
+# never handed out directly since the nested lists and dicts are mutable
+_DEFAULT_CONFIG = {
+    "m3u": "",
+    "sqlite_cache_file": "cache.db",
+    "log_file": "m3u2strm.log",
+    "output_dir": "output",
+    "existing_media_dirs": [],
+    "tmdb_api": "",
+    "emby_api_url": "",
+    "emby_api_key": "",
+    "dry_run": False,
+    "max_workers": None,
+    "verbosity": "normal",
+    "allowed_movie_countries": ["US", "GB", "CA"],
+    "allowed_tv_countries": ["US", "GB", "CA"],
+    "write_non_us_report": True,
+    "tv_group_keywords": ["ser", "action", "comedy", "drama"],
+    "doc_group_keywords": ["doc"],
+    "movie_group_keywords": ["4k", "actionm", "comedym", "dramam"],
+    "replay_group_keywords": ["replays"],
+    "ignore_keywords": {
+        "tvshows": ["ufc", "wwe", "pokemon"],
+        "movies": ["ufc", "pokemon", "wwe"]
+    }
+}
+
 
 class FileHandler:
     """Handles file operations for the web interface."""
     
+    # Read-only view of the defaults for callers that inspect them
+    _default_config = MappingProxyType(_DEFAULT_CONFIG)
+    
     def __init__(self, upload_dir: str = "web/uploads", config_dir: str = "web/configs"):
         self.upload_dir = Path(upload_dir)
         self.config_dir = Path(config_dir)
@@ -27,60 +164,77 @@ class FileHandler:
         self.upload_dir.mkdir(parents=True, exist_ok=True)
         self.config_dir.mkdir(parents=True, exist_ok=True)
         
-        # Configuration presets
-        self._default_config = {
-            "m3u": "",
-            "sqlite_cache_file": "cache.db",
-            "log_file": "m3u2strm.log",
-            "output_dir": "output",
-            "existing_media_dirs": [],
-            "tmdb_api": "",
-            "emby_api_url": "",
-            "emby_api_key": "",
-            "dry_run": False,
-            "max_workers": None,
-            "verbosity": "normal",
-            "allowed_movie_countries": ["US", "GB", "CA"],
-            "allowed_tv_countries": ["US", "GB", "CA"],
-            "write_non_us_report": True,
-            "tv_group_keywords": ["ser", "action", "comedy", "drama"],
-            "doc_group_keywords": ["doc"],
-            "movie_group_keywords": ["4k", "actionm", "comedym", "dramam"],
-            "replay_group_keywords": ["replays"],
-            "ignore_keywords": {
-                "tvshows": ["ufc", "wwe", "pokemon"],
-                "movies": ["ufc", "pokemon", "wwe"]
-            }
-        }
+        # Parsed JSON keyed by path, reused while the file's mtime is unchanged
+        self._config_cache: Dict[Path, Tuple[int, Dict[str, Any]]] = {}
+        # (cache entry it was built from, JSON body, ETag) for GET /api/config
+        self._config_body: Optional[Tuple[Optional[Tuple[int, Dict[str, Any]]], bytes, str]] = None
+    
+    def _read_json_cached(self, path: Path) -> Optional[Dict[str, Any]]:
+        """Read a JSON file, skipping the parse when it is unchanged (result is shared; copy before handing out)."""
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._config_cache.pop(path, None)
+            return None
+        
+        cached = self._config_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        # A file that no longer parses to an object must not keep serving the old entry
+        self._config_cache.pop(path, None)
+        data = _read_json(path)
+        if not isinstance(data, dict):
+            raise ValueError(f"Expected a JSON object in {path.name}, got {type(data).__name__}")
+        self._config_cache[path] = (mtime, data)
+        return data
     
     async def save_upload(self, file) -> Dict[str, Any]:
-        """Save uploaded file with validation."""
+        """Save an UploadFile-like object with validation."""
+        async def chunks():
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                yield chunk
+        
+        return await self.save_stream(chunks(), file.filename)
+    
+    async def save_stream(self, chunks: AsyncIterator[bytes], filename: str) -> Dict[str, Any]:
+        """Save an uploaded playlist from an async byte stream with validation."""
         try:
             # Validate file type
-            if not self._is_valid_m3u_file(file.filename):
-                raise ValueError(f"Invalid file type: {file.filename}")
+            if not self._is_valid_m3u_file(filename):
+                raise ValueError(f"Invalid file type: {filename}")
             
             # Generate safe filename
-            safe_name = self._generate_safe_filename(file.filename)
+            safe_name = self._generate_safe_filename(filename)
             file_path = self.upload_dir / safe_name
             
-            # Save file
-            content = await file.read()
-            async with open(file_path, 'wb') as f:
-                f.write(content)
-            
-            # Get file info
-            file_size = len(content)
-            file_hash = self._calculate_file_hash(content)
+            # Stream to disk, hashing and counting each chunk on the way through
+            hasher = _upload_hasher()
+            file_size = 0
+            try:
+                # 'x' refuses to overwrite should a generated name ever collide
+                async with aiofiles.open(file_path, 'xb') as f:
+                    async for chunk in chunks:
+                        if not chunk:
+                            continue
+                        hasher.update(chunk)
+                        file_size += len(chunk)
+                        await f.write(chunk)
+            except BaseException:
+                # Don't leave a truncated playlist behind when the stream fails
+                file_path.unlink(missing_ok=True)
+                raise
+            file_hash = hasher.hexdigest()
             
-            logger.info(f"Uploaded file: {file.filename} -> {safe_name} ({file_size} bytes)")
+            logger.info(f"Uploaded file: {filename} -> {safe_name} ({file_size} bytes)")
             
             return {
-                "filename": file.filename,
+                "filename": filename,
                 "safe_name": safe_name,
                 "size": file_size,
                 "path": str(file_path),
                 "hash": file_hash,
+                "hash_algorithm": hasher.name,
                 "message": "File uploaded successfully"
             }
             
@@ -90,58 +244,44 @@ class FileHandler:
     
     def _is_valid_m3u_file(self, filename: str) -> bool:
         """Validate if file is a valid M3U playlist."""
-        if not filename:
-            return False
-        
-        # Check file extension
-        if not filename.lower().endswith(('.m3u', '.m3u8')):
-            return False
-        
-        # Check filename characters
-        safe_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_.')
-        if not all(c in safe_chars for c in filename.replace('.', '')):
-            return False
-        
-        return True
+        return bool(filename) and _M3U_FILENAME.fullmatch(filename) is not None
     
     def _generate_safe_filename(self, filename: str) -> str:
         """Generate a safe filename for uploads."""
         # Remove extension and create slug
         name_without_ext = Path(filename).stem
-        safe_name = slugify(name_without_ext, allow_unicode=False)
+        safe_name = _slug(name_without_ext)
         
-        # Add timestamp to avoid conflicts
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_filename = f"{safe_name}_{timestamp}.m3u"
-        
-        # Ensure uniqueness
-        counter = 1
-        while (self.upload_dir / safe_filename).exists():
-            safe_filename = f"{safe_name}_{timestamp}_{counter}.m3u"
-            counter += 1
-        
-        return safe_filename
+        # Timestamp for readability plus a random tail, so no existence probing is needed
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        return f"{safe_name}_{timestamp}_{uuid.uuid4().hex[:8]}.m3u"
     
-    def _calculate_file_hash(self, content: bytes) -> str:
-        """Calculate SHA256 hash of file content."""
-        return hashlib.sha256(content).hexdigest()
+    def _scan_uploads(self):
+        """Yield a DirEntry for each uploaded playlist file."""
+        try:
+            with os.scandir(self.upload_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.m3u') and entry.is_file(follow_symlinks=False):
+                        yield entry
+        except FileNotFoundError:
+            return
     
     def list_uploads(self) -> List[Dict[str, Any]]:
         """List all uploaded files."""
         uploads = []
         
-        for file_path in self.upload_dir.glob("*.m3u"):
+        for entry in self._scan_uploads():
             try:
-                stat = file_path.stat()
+                stat = entry.stat(follow_symlinks=False)
                 uploads.append({
-                    "filename": file_path.name,
+                    "filename": entry.name,
                     "size": stat.st_size,
                     "created": datetime.fromtimestamp(stat.st_ctime),
                     "modified": datetime.fromtimestamp(stat.st_mtime),
-                    "path": str(file_path)
+                    "path": entry.path
                 })
             except Exception as e:
-                logger.error(f"Error reading file info for {file_path}: {e}")
+                logger.error(f"Error reading file info for {entry.path}: {e}")
         
         # Sort by modification time, newest first
         uploads.sort(key=lambda x: x["modified"], reverse=True)
@@ -150,7 +290,8 @@ class FileHandler:
     def get_upload_path(self, filename: str) -> Optional[Path]:
         """Get the full path to an uploaded file."""
         file_path = self.upload_dir / filename
-        if file_path.exists():
+        # A single stat() that also rejects directories
+        if os.path.isfile(file_path):
             return file_path
         return None
     
@@ -166,19 +307,39 @@ class FileHandler:
             logger.error(f"Error deleting upload {filename}: {e}")
         return False
     
-    def save_config(self, config_data: Dict[str, Any]) -> bool:
+    async def save_config(self, config_data: Dict[str, Any]) -> bool:
         """Save configuration to file."""
+        return await asyncio.to_thread(self._save_config_sync, config_data)
+    
+    def _save_config_sync(self, config_data: Dict[str, Any]) -> bool:
         try:
             # Validate required fields
-            required_fields = ["m3u", "sqlite_cache_file", "log_file", "output_dir", "tmdb_api"]
-            for field in required_fields:
-                if field not in config_data or not config_data[field]:
-                    raise ValueError(f"Missing required field: {field}")
+            _check_required_fields(config_data)
             
             # Save configuration
             config_file = self.config_dir / "config.json"
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(config_data, f, indent=2, ensure_ascii=False)
+            _write_json(config_file, config_data)
+            self._config_cache.pop(config_file, None)
+            
+            logger.info("Configuration saved successfully")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error saving configuration: {e}")
+            raise
+    
+    async def save_config_bytes(self, raw: bytes, config: Any = None) -> bool:
+        """Save an already-encoded JSON configuration, checking required fields on config."""
+        return await asyncio.to_thread(self._save_config_bytes_sync, raw, config)
+    
+    def _save_config_bytes_sync(self, raw: bytes, config: Any = None) -> bool:
+        try:
+            if config is not None:
+                _check_required_fields(config)
+            
+            config_file = self.config_dir / "config.json"
+            _write_bytes_atomic(config_file, raw)
+            self._config_cache.pop(config_file, None)
             
             logger.info("Configuration saved successfully")
             return True
@@ -187,39 +348,66 @@ class FileHandler:
             logger.error(f"Error saving configuration: {e}")
             raise
     
-    def load_config(self) -> Dict[str, Any]:
+    async def load_config(self) -> Dict[str, Any]:
         """Load configuration from file."""
+        return await asyncio.to_thread(self._load_config_sync)
+    
+    def _load_config_sync(self) -> Dict[str, Any]:
         config_file = self.config_dir / "config.json"
         
-        if config_file.exists():
-            try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                
-                # Merge with defaults for any missing fields
-                merged_config = self._default_config.copy()
-                merged_config.update(config)
-                
-                return merged_config
-                
-            except Exception as e:
-                logger.error(f"Error loading configuration: {e}")
-                return self._default_config
-        else:
-            return self._default_config
+        try:
+            config = self._read_json_cached(config_file)
+        except Exception as e:
+            logger.error(f"Error loading configuration: {e}")
+            return copy.deepcopy(_DEFAULT_CONFIG)
+        
+        if config is None:
+            return copy.deepcopy(_DEFAULT_CONFIG)
+        
+        # Merge with defaults for any missing fields; deep-copy so nested lists and
+        # dicts are never shared with the defaults or the parse cache
+        return copy.deepcopy({**_DEFAULT_CONFIG, **config})
+    
+    async def load_config_json(self) -> Tuple[bytes, str]:
+        """Load the merged configuration as JSON bytes together with its ETag."""
+        return await asyncio.to_thread(self._load_config_json_sync)
     
-    def save_config_preset(self, preset_name: str, config_data: Dict[str, Any]) -> bool:
+    def _load_config_json_sync(self) -> Tuple[bytes, str]:
+        config_file = self.config_dir / "config.json"
+        
+        try:
+            self._read_json_cached(config_file)
+            source = self._config_cache.get(config_file)
+        except Exception as e:
+            logger.error(f"Error loading configuration: {e}")
+            source = None
+        
+        # Re-encode only when the parsed file behind the body has changed
+        cached = self._config_body
+        if cached is not None and cached[0] is source:
+            return cached[1], cached[2]
+        
+        config = {**_DEFAULT_CONFIG, **source[1]} if source is not None else dict(_DEFAULT_CONFIG)
+        body = _dumps_compact(config)
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        self._config_body = (source, body, etag)
+        return body, etag
+    
+    async def save_config_preset(self, preset_name: str, config_data: Dict[str, Any]) -> bool:
         """Save a configuration preset."""
+        return await asyncio.to_thread(self._save_config_preset_sync, preset_name, config_data)
+    
+    def _save_config_preset_sync(self, preset_name: str, config_data: Dict[str, Any]) -> bool:
         try:
             # Validate preset name
-            safe_name = slugify(preset_name, allow_unicode=False)
+            safe_name = _slug(preset_name)
             if not safe_name:
                 raise ValueError("Invalid preset name")
             
             preset_file = self.config_dir / f"preset_{safe_name}.json"
             
-            with open(preset_file, 'w', encoding='utf-8') as f:
-                json.dump(config_data, f, indent=2, ensure_ascii=False)
+            _write_json(preset_file, config_data)
+            self._config_cache.pop(preset_file, None)
             
             logger.info(f"Configuration preset saved: {preset_name}")
             return True
@@ -228,15 +416,19 @@ class FileHandler:
             logger.error(f"Error saving preset {preset_name}: {e}")
             return False
     
-    def load_config_preset(self, preset_name: str) -> Optional[Dict[str, Any]]:
+    async def load_config_preset(self, preset_name: str) -> Optional[Dict[str, Any]]:
         """Load a configuration preset."""
+        return await asyncio.to_thread(self._load_config_preset_sync, preset_name)
+    
+    def _load_config_preset_sync(self, preset_name: str) -> Optional[Dict[str, Any]]:
         try:
-            safe_name = slugify(preset_name, allow_unicode=False)
+            safe_name = _slug(preset_name)
             preset_file = self.config_dir / f"preset_{safe_name}.json"
             
-            if preset_file.exists():
-                with open(preset_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            preset = self._read_json_cached(preset_file)
+            if preset is not None:
+                # Hand out a deep copy so callers cannot edit the cached preset
+                return copy.deepcopy(preset)
             
         except Exception as e:
             logger.error(f"Error loading preset {preset_name}: {e}")
@@ -260,9 +452,10 @@ class FileHandler:
     def delete_config_preset(self, preset_name: str) -> bool:
         """Delete a configuration preset."""
         try:
-            safe_name = slugify(preset_name, allow_unicode=False)
+            safe_name = _slug(preset_name)
             preset_file = self.config_dir / f"preset_{safe_name}.json"
             
+            self._config_cache.pop(preset_file, None)
             if preset_file.exists():
                 preset_file.unlink()
                 logger.info(f"Deleted preset: {preset_name}")
@@ -278,8 +471,7 @@ class FileHandler:
         errors = []
         
         # Required fields
-        required_fields = ["m3u", "sqlite_cache_file", "log_file", "output_dir", "tmdb_api"]
-        for field in required_fields:
+        for field in _REQUIRED_FIELDS:
             if field not in config_data or not config_data[field]:
                 errors.append(f"Missing required field: {field}")
         
@@ -305,14 +497,9 @@ class FileHandler:
                 errors.append("TMDb API key appears to be too short")
         
         # Country codes validation
-        if "allowed_movie_countries" in config_data:
-            for country in config_data["allowed_movie_countries"]:
-                if not isinstance(country, str) or len(country) != 2:
-                    errors.append(f"Invalid country code: {country}")
-        
-        if "allowed_tv_countries" in config_data:
-            for country in config_data["allowed_tv_countries"]:
-                if not isinstance(country, str) or len(country) != 2:
+        for key in ("allowed_movie_countries", "allowed_tv_countries"):
+            for country in config_data.get(key, ()):
+                if not isinstance(country, str) or country.upper() not in _ISO3166_ALPHA2:
                     errors.append(f"Invalid country code: {country}")
         
         return errors
@@ -341,16 +528,17 @@ class FileHandler:
     
     def cleanup_old_uploads(self, days: int = 7) -> int:
         """Clean up uploads older than specified days."""
-        cutoff_time = datetime.now().timestamp() - (days * 24 * 60 * 60)
+        # Compare integer nanoseconds so the cutoff has no float rounding
+        cutoff_ns = time.time_ns() - int(days * 24 * 60 * 60 * 1_000_000_000)
         deleted_count = 0
         
-        for file_path in self.upload_dir.glob("*.m3u"):
+        for entry in self._scan_uploads():
             try:
-                if file_path.stat().st_mtime < cutoff_time:
-                    file_path.unlink()
+                if entry.stat(follow_symlinks=False).st_mtime_ns < cutoff_ns:
+                    os.unlink(entry.path)
                     deleted_count += 1
-                    logger.info(f"Cleaned up old upload: {file_path.name}")
+                    logger.info(f"Cleaned up old upload: {entry.name}")
             except Exception as e:
-                logger.error(f"Error cleaning up {file_path}: {e}")
+                logger.error(f"Error cleaning up {entry.path}: {e}")
         
         return deleted_count
@@ -0,0 +1,100 @@
+"""
+Logging handler that keeps recent records in memory for the logs WebSocket.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+
+class WebLogHandler(logging.Handler):
+    """Ring buffer of recent log entries that WebSocket clients can tail."""
+
+    def __init__(self, maxlen: int = 500, level=logging.NOTSET):
+        super().__init__(level)
+        # (sequence number, levelno, entry); sequence numbers are consecutive
+        self._entries: deque = deque(maxlen=maxlen)
+        self._seq = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Event] = None
+        self._wake_pending = False
+        # (epoch second, ISO text for that second) reused by records in the same second
+        self._ts_cache: Tuple[int, str] = (-1, "")
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """Bind to the event loop that runs the tailing coroutines."""
+        self._loop = loop
+        self._changed = asyncio.Event()
+
+    def _timestamp(self, record: logging.LogRecord) -> str:
+        second = int(record.created)
+        cached_second, prefix = self._ts_cache
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+            self._ts_cache = (second, prefix)
+        return "%s.%03d" % (prefix, record.msecs)
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            entry = {
+                "timestamp": self._timestamp(record),
+                "level": record.levelname,
+                "logger": record.name,
+                "message": self.format(record),
+            }
+        except Exception:
+            self.handleError(record)
+            return
+
+        # handle() already holds self.lock here
+        self._seq += 1
+        self._entries.append((self._seq, record.levelno, entry))
+
+        # One wakeup per loop iteration however many records arrive meanwhile
+        loop = self._loop
+        if loop is not None and not self._wake_pending and not loop.is_closed():
+            self._wake_pending = True
+            try:
+                loop.call_soon_threadsafe(self._wake)
+            except RuntimeError:
+                self._wake_pending = False
+
+    def _wake(self):
+        with self.lock:
+            self._wake_pending = False
+        # Swap in a fresh event so waiters that re-check see only future records
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def latest_seq(self) -> int:
+        """Sequence number of the newest buffered entry."""
+        with self.lock:
+            return self._seq
+
+    def recent(self, limit: int, min_level: int = logging.NOTSET) -> List[Dict]:
+        """Return up to limit of the newest entries at or above min_level, oldest first."""
+        selected = []
+        with self.lock:
+            # Walk backwards from the newest entry and stop once limit are found
+            for _, levelno, entry in reversed(self._entries):
+                if len(selected) >= limit:
+                    break
+                if levelno >= min_level:
+                    selected.append(entry)
+        selected.reverse()
+        return selected
+
+    async def tail(self, cursor: int) -> Tuple[int, List[Dict]]:
+        """Wait for entries newer than cursor; return the new cursor and the entries."""
+        while True:
+            changed = self._changed
+            with self.lock:
+                if self._seq > cursor:
+                    # Deque indexing is O(1) near the ends, so only the new tail is walked
+                    size = len(self._entries)
+                    start = size - min(self._seq - cursor, size)
+                    entries = [self._entries[i][2] for i in range(start, size)]
+                    return self._seq, entries
+            await changed.wait()
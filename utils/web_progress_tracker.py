@@ -3,14 +3,20 @@ Web-compatible progress tracker that integrates with the existing ProgressTracke
 """
 
 import asyncio
+import json
 import threading
 import time
-from typing import Dict, List, Optional, Callable, Any
+from typing import Dict, Optional, Callable, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from contextlib import contextmanager
 import logging
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
 from progress_tracker import ProgressTracker, ProgressPhase, VerbosityLevel, PhaseProgress, ProcessingStats
 from api.models import ProgressUpdate
 
@@ -32,7 +38,7 @@ class WebProgressPhase(Enum):
     ERROR = "Error"
 
 
-@dataclass
+@dataclass(slots=True)
 class WebPhaseProgress:
     """Web-specific phase progress tracking."""
     phase: WebProgressPhase
@@ -47,6 +53,31 @@ class WebPhaseProgress:
     error_message: Optional[str] = None
 
 
+# Weight of each phase in the overall progress; unlisted phases count 1.0
+_PHASE_WEIGHTS = {
+    WebProgressPhase.UPLOADING: 5.0,
+    WebProgressPhase.CONFIGURING: 5.0,
+    WebProgressPhase.SCANNING_LOCAL: 15.0,
+    WebProgressPhase.PARSING_M3U: 20.0,
+    WebProgressPhase.FILTERING_TMDB: 25.0,
+    WebProgressPhase.CREATING_STRM: 25.0,
+    WebProgressPhase.CLEANUP: 5.0,
+}
+_TOTAL_PHASE_WEIGHT = sum(_PHASE_WEIGHTS.values())
+
+
+def _offer(client_queue: asyncio.Queue, data: str):
+    """Enqueue a frame, dropping the oldest pending one if the queue is full."""
+    try:
+        client_queue.put_nowait(data)
+    except asyncio.QueueFull:
+        try:
+            client_queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        client_queue.put_nowait(data)
+
+
 class WebProgressTracker:
     """Web-compatible progress tracker that wraps the existing ProgressTracker."""
     
@@ -56,10 +87,25 @@ class WebProgressTracker:
         self._current_web_phase: WebProgressPhase = WebProgressPhase.IDLE
         self._stats = ProcessingStats()
         self._start_time = time.time()
-        self._callbacks: List[Callable[[Any], None]] = []
-        self._websocket_clients: List[asyncio.Queue] = []
+        # Copy-on-write: registration swaps in a new tuple, so readers need no lock
+        self._callbacks: Tuple[Callable[[Any], None], ...] = ()
+        self._websocket_clients: Tuple[asyncio.Queue, ...] = ()
         self._shutdown_flag = threading.Event()
         
+        # Ticks only mark the state dirty; one flush per interval builds the
+        # snapshot and fans it out to callbacks and WebSocket clients
+        self._dirty = False
+        self._flush_pending = False
+        self._last_broadcast = 0.0
+        self._coalesce_interval = 0.05
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Every change bumps _version; readers reuse the published snapshot
+        # lock-free while its version is still current
+        self._version = 0
+        self._latest_snapshot: Tuple[int, Optional[Dict[str, Any]]] = (-1, None)
+        self._latest_json: Tuple[Optional[Dict[str, Any]], str] = (None, "")
+        
         # Bridge to existing ProgressTracker
         self._core_tracker: Optional[ProgressTracker] = None
         self._core_phase_mapping = {
@@ -73,6 +119,12 @@ class WebProgressTracker:
         # Initialize web phases
         for phase in WebProgressPhase:
             self._web_phases[phase] = WebPhaseProgress(phase=phase)
+        # Phase objects are reset in place, never replaced, so pair them with
+        # their weights once instead of looking weights up on every snapshot
+        self._weighted_phases = tuple(
+            (progress, _PHASE_WEIGHTS.get(phase, 1.0))
+            for phase, progress in self._web_phases.items()
+        )
     
     def set_core_tracker(self, tracker: ProgressTracker):
         """Set the core ProgressTracker to bridge with."""
@@ -171,120 +223,170 @@ class WebProgressTracker:
             self._broadcast_update()
     
     def get_web_progress(self) -> Dict[str, Any]:
-        """Get current web progress as a dictionary."""
+        """Get current web progress as a dictionary (shared between readers; do not mutate)."""
+        version, snapshot = self._latest_snapshot
+        if snapshot is not None and version == self._version:
+            return snapshot
+        
         with self._lock:
-            current_phase = self._web_phases[self._current_web_phase]
-            
-            # Calculate overall progress
-            overall_progress = self._calculate_overall_progress()
-            
-            return {
-                "current_phase": self._current_web_phase.value,
-                "phase_progress": current_phase.progress,
-                "overall_progress": overall_progress,
-                "processed": current_phase.processed,
-                "total": current_phase.total,
-                "current_item": current_phase.current_item,
-                "items_per_second": current_phase.items_per_second,
-                "elapsed_time": current_phase.elapsed_time,
-                "stats": {
-                    "movies_found": self._stats.movies_found,
-                    "movies_allowed": self._stats.movies_allowed,
-                    "movies_excluded": self._stats.movies_excluded,
-                    "tv_episodes_found": self._stats.tv_episodes_found,
-                    "tv_episodes_allowed": self._stats.tv_episodes_allowed,
-                    "tv_episodes_excluded": self._stats.tv_episodes_excluded,
-                    "documentaries_found": self._stats.documentaries_found,
-                    "documentaries_allowed": self._stats.documentaries_allowed,
-                    "documentaries_excluded": self._stats.documentaries_excluded,
-                    "strm_created": self._stats.strm_created,
-                    "strm_skipped": self._stats.strm_skipped,
-                    "strm_orphaned": self._stats.strm_orphaned,
-                    "errors": self._stats.errors[-10:]  # Last 10 errors
-                },
-                "error_message": current_phase.error_message,
-                "is_complete": self._current_web_phase == WebProgressPhase.COMPLETE,
-                "is_error": self._current_web_phase == WebProgressPhase.ERROR
-            }
+            version = self._version
+            snapshot = self._build_snapshot()
+            self._latest_snapshot = (version, snapshot)
+            return snapshot
+    
+    def get_web_progress_json(self) -> str:
+        """Get current web progress as compact JSON, encoded once per snapshot."""
+        snapshot = self.get_web_progress()
+        cached_snapshot, encoded = self._latest_json
+        if cached_snapshot is snapshot:
+            return encoded
+        
+        if orjson is not None:
+            encoded = orjson.dumps(snapshot).decode("utf-8")
+        else:
+            encoded = json.dumps(snapshot, separators=(",", ":"), ensure_ascii=False)
+        self._latest_json = (snapshot, encoded)
+        return encoded
+    
+    def _build_snapshot(self) -> Dict[str, Any]:
+        """Build a fresh progress dictionary; callers hold the lock."""
+        current_phase = self._web_phases[self._current_web_phase]
+        
+        # Calculate overall progress
+        overall_progress = self._calculate_overall_progress()
+        
+        return {
+            "current_phase": self._current_web_phase.value,
+            "phase_progress": current_phase.progress,
+            "overall_progress": overall_progress,
+            "processed": current_phase.processed,
+            "total": current_phase.total,
+            "current_item": current_phase.current_item,
+            "items_per_second": current_phase.items_per_second,
+            "elapsed_time": current_phase.elapsed_time,
+            "stats": {
+                "movies_found": self._stats.movies_found,
+                "movies_allowed": self._stats.movies_allowed,
+                "movies_excluded": self._stats.movies_excluded,
+                "tv_episodes_found": self._stats.tv_episodes_found,
+                "tv_episodes_allowed": self._stats.tv_episodes_allowed,
+                "tv_episodes_excluded": self._stats.tv_episodes_excluded,
+                "documentaries_found": self._stats.documentaries_found,
+                "documentaries_allowed": self._stats.documentaries_allowed,
+                "documentaries_excluded": self._stats.documentaries_excluded,
+                "strm_created": self._stats.strm_created,
+                "strm_skipped": self._stats.strm_skipped,
+                "strm_orphaned": self._stats.strm_orphaned,
+                "errors": self._stats.errors[-10:]  # Last 10 errors
+            },
+            "error_message": current_phase.error_message,
+            "is_complete": self._current_web_phase == WebProgressPhase.COMPLETE,
+            "is_error": self._current_web_phase == WebProgressPhase.ERROR
+        }
     
     def _calculate_overall_progress(self) -> float:
         """Calculate overall progress across all phases."""
-        if not self._web_phases:
+        if not self._weighted_phases:
             return 0.0
         
-        # Weight different phases
-        phase_weights = {
-            WebProgressPhase.UPLOADING: 5.0,
-            WebProgressPhase.CONFIGURING: 5.0,
-            WebProgressPhase.SCANNING_LOCAL: 15.0,
-            WebProgressPhase.PARSING_M3U: 20.0,
-            WebProgressPhase.FILTERING_TMDB: 25.0,
-            WebProgressPhase.CREATING_STRM: 25.0,
-            WebProgressPhase.CLEANUP: 5.0,
-        }
-        
-        total_weight = sum(phase_weights.values())
         weighted_progress = 0.0
         
-        for phase, progress in self._web_phases.items():
-            weight = phase_weights.get(phase, 1.0)
+        for progress, weight in self._weighted_phases:
             if progress.completed_at:
                 weighted_progress += weight
             elif progress.started_at:
                 weighted_progress += (progress.progress / 100.0) * weight
         
-        return min(100.0, (weighted_progress / total_weight) * 100.0)
+        return min(100.0, (weighted_progress / _TOTAL_PHASE_WEIGHT) * 100.0)
     
     def register_callback(self, callback: Callable[[Any], None]):
         """Register a callback for progress updates."""
         with self._lock:
-            self._callbacks.append(callback)
+            self._callbacks = self._callbacks + (callback,)
     
     def _notify_callbacks(self):
         """Notify registered callbacks."""
-        callbacks_to_notify = []
-        with self._lock:
-            callbacks_to_notify = self._callbacks.copy()
-        
-        for callback in callbacks_to_notify:
+        for callback in self._callbacks:
             try:
                 callback(self)
             except Exception as e:
                 logger.error(f"Error in callback: {e}")
     
+    def _bind_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """Return the cached event loop, capturing the running one if none is usable."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            self._loop = loop
+        return loop
+    
     def _broadcast_update(self):
-        """Broadcast progress update to WebSocket clients."""
-        progress_data = self.get_web_progress()
+        """Mark progress as changed and flush at most once per coalesce interval."""
+        with self._lock:
+            self._version += 1
+            self._dirty = True
+            if self._flush_pending:
+                return
+            delay = self._coalesce_interval - (time.monotonic() - self._last_broadcast)
+            loop = self._bind_loop()
+            if loop is None:
+                # No event loop to defer to: flush inline once the interval has
+                # passed, otherwise arm a timer so the latest state still goes out
+                if delay <= 0:
+                    self._do_broadcast()
+                    return
+                self._flush_pending = True
+                timer = threading.Timer(delay, self._do_broadcast)
+                timer.daemon = True
+                timer.start()
+                return
+            self._flush_pending = True
+        
+        # Safe from worker threads; the timer itself is armed on the loop thread
+        loop.call_soon_threadsafe(loop.call_later, max(0.0, delay), self._do_broadcast)
+    
+    def _do_broadcast(self):
+        """Build one progress snapshot and send it to callbacks and WebSocket clients."""
+        with self._lock:
+            self._flush_pending = False
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._last_broadcast = time.monotonic()
+            # Encoded once here and shared by every subscriber
+            progress_data = self.get_web_progress_json()
         
         # Notify callbacks
         self._notify_callbacks()
         
-        # Broadcast to WebSocket clients (non-blocking)
-        for client_queue in self._websocket_clients[:]:
+        # Runs on the loop thread when one is bound, otherwise on the updating
+        # thread or the flush timer; _offer never blocks either way
+        for client_queue in self._websocket_clients:
             try:
-                # Use asyncio.run_coroutine_threadsafe for thread safety
-                loop = asyncio.get_event_loop()
-                if loop and loop.is_running():
-                    asyncio.run_coroutine_threadsafe(
-                        client_queue.put(progress_data), 
-                        loop
-                    )
+                _offer(client_queue, progress_data)
             except Exception as e:
                 logger.debug(f"Error broadcasting to WebSocket client: {e}")
                 # Remove dead client
-                if client_queue in self._websocket_clients:
-                    self._websocket_clients.remove(client_queue)
+                self.remove_websocket_client(client_queue)
     
     def add_websocket_client(self, client_queue: asyncio.Queue):
         """Add a WebSocket client for progress updates."""
+        # The queue receives JSON text frames and must be bounded: progress is
+        # latest-wins, so when a slow client's queue is full the oldest unread
+        # snapshot is dropped instead of letting the backlog grow
         with self._lock:
-            self._websocket_clients.append(client_queue)
+            self._bind_loop()
+            self._websocket_clients = self._websocket_clients + (client_queue,)
     
     def remove_websocket_client(self, client_queue: asyncio.Queue):
         """Remove a WebSocket client."""
         with self._lock:
-            if client_queue in self._websocket_clients:
-                self._websocket_clients.remove(client_queue)
+            self._websocket_clients = tuple(
+                q for q in self._websocket_clients if q is not client_queue
+            )
     
     def reset(self):
         """Reset progress tracker."""
@@ -310,4 +412,4 @@ class WebProgressTracker:
         """Shutdown the progress tracker."""
         self._shutdown_flag.set()
         with self._lock:
-            self._websocket_clients.clear()
+            self._websocket_clients = ()
@@ -8,68 +8,138 @@ import json
 import logging
 import asyncio
 import threading
-from pathlib import Path
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, List
+from urllib.parse import parse_qs
 
-from fastapi import FastAPI, HTTPException, Request, Form, UploadFile, File
-from fastapi.responses import HTMLResponse, JSONResponse
+import anyio
+from fastapi import Depends, FastAPI, HTTPException, Request, Form
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from jinja2 import FileSystemBytecodeCache
+from starlette.requests import HTTPConnection
 from starlette.websockets import WebSocket, WebSocketDisconnect
 
-from api.models import ProcessingConfig, ProcessingStatus, ProcessingResult
+from pydantic import ValidationError
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to Starlette's stdlib encoder
+    orjson = None
+
+from api.models import ProcessingConfig, ProcessingStatus, ProcessingResult, PROCESSING_CONFIG_ADAPTER
 from utils.web_progress_tracker import WebProgressTracker
 from utils.file_handler import FileHandler
-from background_tasks import ProcessingManager
+from utils.web_log_handler import WebLogHandler
+from background_tasks import ProcessingManager, QueueFullError
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+class _ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (FastAPI's own ORJSONResponse is deprecated)."""
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _dumps_text(data) -> str:
+    if orjson is not None:
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="M3U2strm3 Web Interface",
     description="Web interface for M3U2strm3 IPTV playlist processor",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=_ORJSONResponse if orjson is not None else JSONResponse
 )
 
 # Add CORS middleware
+# Comma-separated list of allowed origins; the dashboard itself is same-origin
+CORS_ORIGINS = [o.strip() for o in os.environ.get("CORS_ORIGINS", "").split(",") if o.strip()]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=CORS_ORIGINS,
+    # Credentials are only shared with explicitly configured origins
+    allow_credentials=bool(CORS_ORIGINS) and "*" not in CORS_ORIGINS,
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "if-none-match"],
+    max_age=86400,  # let browsers reuse preflight results for a day
 )
 
+class CachedStatic(StaticFiles):
+    """StaticFiles that lets browsers cache versioned asset URLs forever."""
+    
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            # Only ?v=<static_version> URLs are immutable; bare URLs revalidate via ETag
+            query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+            if query.get("v"):
+                response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+            else:
+                response.headers["Cache-Control"] = "no-cache"
+        return response
+
+
+def _static_version(directory: str) -> str:
+    """Version token that changes whenever any static asset is modified."""
+    latest = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            latest = max(latest, os.stat(os.path.join(root, name)).st_mtime_ns)
+    return format(latest, "x")
+
+
 # Mount static files
-app.mount("/static", StaticFiles(directory="web/static"), name="static")
+app.mount("/static", CachedStatic(directory="web/static"), name="static")
 
 # Initialize templates
 templates = Jinja2Templates(directory="web/templates")
+templates.env.globals["static_version"] = _static_version("web/static")
+# Templates only change on deploy: skip the per-render mtime check and reuse
+# compiled bytecode across restarts
+templates.env.auto_reload = False
+
 
-# Global instances
-progress_tracker: Optional[WebProgressTracker] = None
-file_handler: Optional[FileHandler] = None
-processing_manager: Optional[ProcessingManager] = None
+def _ensure_dirs(paths):
+    """Create each directory in paths that does not exist yet."""
+    for path in paths:
+        if not os.path.isdir(path):
+            os.makedirs(path, exist_ok=True)
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize global components on startup."""
-    global progress_tracker, file_handler, processing_manager
+    """Initialize shared components on startup."""
+    # Create necessary directories off the event loop
+    await asyncio.to_thread(
+        _ensure_dirs, ("web/uploads", "web/configs", "web/logs", "web/.jinja_cache")
+    )
+    
+    # Compile every template now instead of on its first request
+    templates.env.bytecode_cache = FileSystemBytecodeCache("web/.jinja_cache")
+    for name in templates.env.list_templates(extensions=["html"]):
+        templates.env.get_template(name)
     
-    # Create necessary directories
-    Path("web/uploads").mkdir(exist_ok=True)
-    Path("web/configs").mkdir(exist_ok=True)
-    Path("web/logs").mkdir(exist_ok=True)
+    # Initialize components; routes receive them through the dependencies below
+    app.state.progress_tracker = WebProgressTracker()
+    app.state.file_handler = FileHandler(upload_dir="web/uploads", config_dir="web/configs")
+    app.state.processing_manager = ProcessingManager(
+        app.state.progress_tracker, app.state.file_handler
+    )
     
-    # Initialize components
-    progress_tracker = WebProgressTracker()
-    file_handler = FileHandler(upload_dir="web/uploads", config_dir="web/configs")
-    processing_manager = ProcessingManager(progress_tracker, file_handler)
+    # Feed the logs WebSocket from the root logger
+    app.state.log_handler = WebLogHandler()
+    app.state.log_handler.attach(asyncio.get_running_loop())
+    logging.getLogger().addHandler(app.state.log_handler)
     
     logger.info("M3U2strm3 Web Interface started successfully")
 
@@ -77,14 +147,41 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up resources on shutdown."""
-    global processing_manager
+    log_handler = getattr(app.state, "log_handler", None)
+    if log_handler:
+        logging.getLogger().removeHandler(log_handler)
     
+    processing_manager = getattr(app.state, "processing_manager", None)
     if processing_manager:
         await processing_manager.shutdown()
     
     logger.info("M3U2strm3 Web Interface shutdown complete")
 
 
+def get_progress_tracker(conn: HTTPConnection) -> WebProgressTracker:
+    return conn.app.state.progress_tracker
+
+
+def get_file_handler(conn: HTTPConnection) -> FileHandler:
+    return conn.app.state.file_handler
+
+
+def get_processing_manager(conn: HTTPConnection) -> ProcessingManager:
+    return conn.app.state.processing_manager
+
+
+def get_log_handler(conn: HTTPConnection) -> WebLogHandler:
+    return conn.app.state.log_handler
+
+
+async def _parse_processing_config(request: Request) -> ProcessingConfig:
+    """Validate the raw request body as a ProcessingConfig."""
+    try:
+        return PROCESSING_CONFIG_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False, include_input=False))
+
+
 # Routes
 
 @app.get("/", response_class=HTMLResponse)
@@ -125,12 +222,7 @@ async def logs_page(request: Request):
 
 # API Endpoints
 
-@app.get("/api/status")
-async def get_status():
-    """Get current system status."""
-    if not processing_manager:
-        raise HTTPException(status_code=500, detail="System not initialized")
-    
+def _status_payload(processing_manager: ProcessingManager) -> Dict:
     return {
         "status": "running",
         "current_job": processing_manager.get_current_job(),
@@ -142,37 +234,54 @@ async def get_status():
     }
 
 
+@app.get("/api/status", deprecated=True)
+async def get_status(processing_manager: ProcessingManager = Depends(get_processing_manager)):
+    """Get current system status (prefer /api/snapshot when polling)."""
+    return _status_payload(processing_manager)
+
+
+@app.get("/api/snapshot")
+async def get_snapshot(processing_manager: ProcessingManager = Depends(get_processing_manager),
+                       progress_tracker: WebProgressTracker = Depends(get_progress_tracker)):
+    """Get system status and processing progress in a single response."""
+    # Splice in the tracker's pre-encoded progress instead of re-serializing it
+    body = '{"status":%s,"progress":%s}' % (
+        _dumps_text(_status_payload(processing_manager)),
+        progress_tracker.get_web_progress_json(),
+    )
+    return Response(content=body, media_type="application/json")
+
+
 @app.get("/api/config")
-async def get_config():
+async def get_config(request: Request, file_handler: FileHandler = Depends(get_file_handler)):
     """Get current configuration."""
-    if not file_handler:
-        raise HTTPException(status_code=500, detail="File handler not initialized")
-    
-    config = file_handler.load_config()
-    return config
+    body, etag = await file_handler.load_config_json()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
 @app.post("/api/config")
-async def save_config(config: ProcessingConfig):
+async def save_config(request: Request, file_handler: FileHandler = Depends(get_file_handler)):
     """Save configuration."""
-    if not file_handler:
-        raise HTTPException(status_code=500, detail="File handler not initialized")
-    
+    config = await _parse_processing_config(request)
     try:
-        file_handler.save_config(config.dict())
+        # Model straight to JSON bytes, without an intermediate dict tree
+        await file_handler.save_config_bytes(
+            PROCESSING_CONFIG_ADAPTER.dump_json(config, indent=2), config
+        )
         return {"message": "Configuration saved successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/upload")
-async def upload_m3u_file(file: UploadFile = File(...)):
-    """Upload M3U playlist file."""
-    if not file_handler:
-        raise HTTPException(status_code=500, detail="File handler not initialized")
-    
+async def upload_m3u_file(request: Request, filename: str,
+                          file_handler: FileHandler = Depends(get_file_handler)):
+    """Upload M3U playlist file sent as the raw request body (?filename=...)."""
     try:
-        file_info = await file_handler.save_upload(file)
+        # Write chunks as they arrive instead of spooling a multipart UploadFile first
+        file_info = await file_handler.save_stream(request.stream(), filename)
         return {
             "message": "File uploaded successfully",
             "filename": file_info["filename"],
@@ -184,48 +293,49 @@ async def upload_m3u_file(file: UploadFile = File(...)):
 
 
 @app.post("/api/process")
-async def start_processing(config: ProcessingConfig):
+async def start_processing(request: Request,
+                           processing_manager: ProcessingManager = Depends(get_processing_manager)):
     """Start processing with given configuration."""
-    if not processing_manager:
-        raise HTTPException(status_code=500, detail="Processing manager not initialized")
-    
+    config = await _parse_processing_config(request)
     try:
         job_id = await processing_manager.submit_job(config)
         return {
             "message": "Processing started",
             "job_id": job_id
         }
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/progress")
-async def get_progress():
-    """Get current processing progress."""
-    if not progress_tracker:
-        raise HTTPException(status_code=500, detail="Progress tracker not initialized")
-    
-    return progress_tracker.get_web_progress()
+@app.get("/api/progress", deprecated=True)
+async def get_progress(progress_tracker: WebProgressTracker = Depends(get_progress_tracker)):
+    """Get current processing progress (prefer /api/snapshot when polling)."""
+    # Reuse the tracker's pre-encoded snapshot rather than re-serializing the dict
+    return Response(content=progress_tracker.get_web_progress_json(), media_type="application/json")
 
 
 @app.get("/api/logs")
-async def get_logs(level: str = "INFO", limit: int = 100):
-    """Get recent log entries."""
-    # This would integrate with the actual logging system
+async def get_logs(level: str = "INFO", limit: int = 100,
+                   log_handler: WebLogHandler = Depends(get_log_handler)):
+    """Get recent log entries at or above the given level."""
+    min_level = logging.getLevelName(level.upper())
+    if not isinstance(min_level, int):
+        raise HTTPException(status_code=400, detail=f"Unknown log level: {level}")
+    
+    logs = log_handler.recent(max(0, limit), min_level)
     return {
-        "logs": [],
-        "total": 0,
+        "logs": logs,
+        "total": len(logs),
         "level": level,
         "limit": limit
     }
 
 
 @app.post("/api/stop")
-async def stop_processing():
+async def stop_processing(processing_manager: ProcessingManager = Depends(get_processing_manager)):
     """Stop current processing."""
-    if not processing_manager:
-        raise HTTPException(status_code=500, detail="Processing manager not initialized")
-    
     try:
         await processing_manager.stop_current_job()
         return {"message": "Processing stopped"}
@@ -233,41 +343,76 @@ async def stop_processing():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _send_until_disconnect(websocket: WebSocket, sender):
+    """Run sender() while watching for the client going away, whichever ends first.
+    
+    Without the receive side a dead socket is only noticed on the next send, which
+    may never come while progress or logs are idle.
+    """
+    error = None
+    
+    async with anyio.create_task_group() as tg:
+        async def send():
+            nonlocal error
+            try:
+                await sender()
+            except Exception as e:
+                error = e
+            finally:
+                tg.cancel_scope.cancel()
+        
+        tg.start_soon(send)
+        message = {"type": "websocket.receive"}
+        while message["type"] != "websocket.disconnect":
+            message = await websocket.receive()
+        tg.cancel_scope.cancel()
+    
+    if error is not None:
+        raise error
+    raise WebSocketDisconnect(message.get("code", 1000))
+
+
 @app.websocket("/ws/progress")
-async def websocket_progress(websocket: WebSocket):
+async def websocket_progress(websocket: WebSocket,
+                             progress_tracker: WebProgressTracker = Depends(get_progress_tracker)):
     """WebSocket endpoint for real-time progress updates."""
     await websocket.accept()
     
-    try:
+    # Frames are pushed only when progress changes; the tracker keeps the latest one
+    updates: asyncio.Queue = asyncio.Queue(maxsize=1)
+    progress_tracker.add_websocket_client(updates)
+    
+    async def send_updates():
+        await websocket.send_text(progress_tracker.get_web_progress_json())
         while True:
-            if progress_tracker:
-                progress_data = progress_tracker.get_web_progress()
-                await websocket.send_json(progress_data)
-            
-            await asyncio.sleep(1)  # Send updates every second
-            
+            await websocket.send_text(await updates.get())
+    
+    try:
+        await _send_until_disconnect(websocket, send_updates)
     except WebSocketDisconnect:
         logger.info("Client disconnected from progress WebSocket")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
+    finally:
+        progress_tracker.remove_websocket_client(updates)
 
 
 @app.websocket("/ws/logs")
-async def websocket_logs(websocket: WebSocket):
+async def websocket_logs(websocket: WebSocket,
+                         log_handler: WebLogHandler = Depends(get_log_handler)):
     """WebSocket endpoint for real-time log streaming."""
     await websocket.accept()
     
-    try:
+    # Replay up to the last 100 buffered entries, then follow new ones
+    async def send_logs():
+        cursor = max(0, log_handler.latest_seq() - 100)
         while True:
-            # This would stream actual log entries
-            log_entry = {
-                "timestamp": datetime.now().isoformat(),
-                "level": "INFO",
-                "message": "Log streaming placeholder"
-            }
-            await websocket.send_json(log_entry)
-            await asyncio.sleep(2)
-            
+            cursor, entries = await log_handler.tail(cursor)
+            for log_entry in entries:
+                await websocket.send_text(_dumps_text(log_entry))
+    
+    try:
+        await _send_until_disconnect(websocket, send_logs)
     except WebSocketDisconnect:
         logger.info("Client disconnected from logs WebSocket")
     except Exception as e:
@@ -281,5 +426,8 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8280,
         reload=True,
-        log_level="info"
+        log_level="info",
+        # "auto" picks uvloop/httptools from uvicorn[standard] and falls back off Linux
+        loop="auto",
+        http="auto",
     )